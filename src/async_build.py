@@ -0,0 +1,132 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from helpers import PageRecorder, find_pages, read_page, render_content
+from output import DiskOutput
+from template import Template
+import tracing
+
+
+def render_page_text(job):
+    #rendering a single page to a string, the writing is left to the I/O threads
+    #returns (error message or None, title of the page, html of the page, search terms or None, trace events recorded in a worker process)
+    from_path, template, dest_path, disk_cache, content, title, index_search = job
+    error = None
+    html = None
+    search_terms = {} if index_search else None
+    with tracing.span("page", path=from_path):
+        try:
+            print(f"Generating page from {from_path} to {dest_path} using {template.path}")
+            title, page_content = render_content(from_path, disk_cache, content, title, search_terms)
+            with tracing.span("render", path=dest_path):
+                html = template.render({"Title": title, "Content": page_content})
+        except Exception as e:
+            error = str(e)
+
+    if multiprocessing.parent_process() is not None:
+        return error, title, html, search_terms, tracing.take_events()
+    return error, title, html, search_terms, []
+
+
+def write_page(output, dest_path, html):
+    with tracing.span("write", path=dest_path):
+        with output.open(dest_path, 'w') as file:
+            file.write(html)
+
+
+async def generate_pages_async(dir_path_content, template_path, dest_dir_path, manifest=None, jobs=1, disk_cache=None,
+                               site_index=None, search_index=None, compressor=None, output=None, max_in_flight=32, io_threads=8):
+    #the same build as generate_pages_recursive, but source reads and page writes run in a pool of I/O threads,
+    #overlapping with the rendering of other pages, so a slow (network) filesystem does not stall the build
+    #at most max_in_flight pages are between their read and the end of their write, which caps the memory used by the pipeline
+    #pages are still recorded in discovery order, so the manifest and the indexes do not depend on the timing of the I/O
+    #returns the number of pages that failed to generate
+    if output is None:
+        output = DiskOutput()
+    loop = asyncio.get_running_loop()
+    template = Template.load(template_path)
+    templates = {}
+    recorder = PageRecorder(dest_dir_path, manifest, site_index, search_index, compressor)
+
+    io_pool = ThreadPoolExecutor(max_workers=io_threads)
+    #rendering runs outside of the event loop too, so new reads and writes keep being scheduled while a page renders
+    if jobs > 1 and not output.process_local:
+        initializer = tracing.start_worker if tracing.enabled else None
+        render_pool = ProcessPoolExecutor(max_workers=jobs, initializer=initializer)
+    else:
+        render_pool = ThreadPoolExecutor(max_workers=1)
+
+    slots = asyncio.Semaphore(max_in_flight)
+
+    async def process(src_path, dest_path, previous, current):
+        #previous and current are (discovered, recorded) futures, chaining the bookkeeping of the pages in discovery order
+        #while reads, renders and writes of different pages overlap freely
+        discovered, recorded = current
+        try:
+            try:
+                page = await loop.run_in_executor(io_pool, read_page, src_path, templates)
+            except Exception as e:
+                recorder.read_failed(src_path, e)
+                page = None
+
+            await previous[0]
+            try:
+                needs_render = page is not None and recorder.needs_render(src_path, dest_path, page[0], page[3])
+            finally:
+                discovered.set_result(None)
+
+            if needs_render:
+                metadata, body, page_template, src_hash = page
+                job = (src_path, page_template or template, dest_path, disk_cache, body, metadata.get("title"), search_index is not None)
+                error, title, html, search_terms, trace_events = await loop.run_in_executor(render_pool, render_page_text, job)
+                tracing.add_events(trace_events)
+                if error is None:
+                    try:
+                        await loop.run_in_executor(io_pool, write_page, output, dest_path, html)
+                    except Exception as e:
+                        error = str(e)
+                del html
+
+                await previous[1]
+                recorder.rendered(src_path, dest_path, src_hash, error, title, search_terms)
+                if disk_cache is not None:
+                    disk_cache.mark_used(body)
+        except Exception as e:
+            print(f"An error occurred while generating {src_path}: {str(e)}")
+            recorder.failures += 1
+        finally:
+            if not discovered.done():
+                discovered.set_result(None)
+            await previous[1]
+            recorded.set_result(None)
+            slots.release()
+
+    try:
+        with tracing.span("pipeline", path=dir_path_content):
+            pages = find_pages(dir_path_content, dest_dir_path, output)
+            previous = (loop.create_future(), loop.create_future())
+            previous[0].set_result(None)
+            previous[1].set_result(None)
+            tasks = []
+            while True:
+                #directories are listed in the I/O threads as well, one entry at a time
+                page = await loop.run_in_executor(io_pool, next, pages, None)
+                if page is None:
+                    break
+                await slots.acquire()
+                current = (loop.create_future(), loop.create_future())
+                tasks.append(asyncio.ensure_future(process(page[0], page[1], previous, current)))
+                previous = current
+                #finished pages are dropped, so the list of tasks stays as small as the pipeline
+                if len(tasks) > max_in_flight:
+                    tasks = [task for task in tasks if not task.done()]
+            await asyncio.gather(*tasks)
+    except Exception as e:
+        #the pages that were not generated are unknown, so the build counts as failed
+        print(f"An error occurred, the build is incomplete: {str(e)}")
+        recorder.failures += 1
+    finally:
+        render_pool.shutdown()
+        io_pool.shutdown()
+
+    return recorder.failures
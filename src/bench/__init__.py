@@ -0,0 +1,2 @@
+#benchmark suite for the static site generator: synthetic content trees, per stage timings and regression checks
+#run it from the repository root with ./bench.sh
@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+import tempfile
+from bench.corpus import MIXES, generate_corpus
+from bench.stages import STRESS_MAX_MS_PER_KB, check_stress, compare_results, run_benchmark, run_stress
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmark the static site generator on synthetic content")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    generate = commands.add_parser("generate", help="write a synthetic content tree")
+    run = commands.add_parser("run", help="time every build stage and write the results as JSON")
+    for command in (generate, run):
+        command.add_argument("--pages", type=int, default=100, help="number of pages")
+        command.add_argument("--mix", choices=MIXES, default="mixed", help="kind of content in every page")
+        command.add_argument("--size", type=int, default=3, help="number of sections in every page")
+        command.add_argument("--seed", type=int, default=0, help="random seed, the same seed gives the same corpus")
+    generate.add_argument("dest", help="directory to write the content tree to")
+    
+    run.add_argument("--template", default="template.html", help="template used for the template stage")
+    run.add_argument("--repeat", type=int, default=3, help="runs per stage, the fastest one is kept")
+    run.add_argument("--out", help="file to write the JSON results to, printed when not given")
+    run.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    run.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    
+    compare = commands.add_parser("compare", help="compare two JSON results and flag the regressions")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    
+    stress = commands.add_parser("stress", help="time the parsers on adversarial input and flag the ones that are not linear")
+    stress.add_argument("--size-kb", type=int, default=64, help="size of every adversarial input, in KB")
+    stress.add_argument("--repeat", type=int, default=3, help="runs per input, the fastest one is kept")
+    stress.add_argument("--max-ms-per-kb", type=float, default=STRESS_MAX_MS_PER_KB, help="parsing time allowed per KB of input")
+    return parser
+
+
+def load_results(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def report(baseline, current, threshold):
+    regressions, table = compare_results(baseline, current, threshold)
+    print(table)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    args = make_parser().parse_args()
+    
+    if args.command == "generate":
+        paths = generate_corpus(args.dest, args.pages, args.mix, args.size, args.seed)
+        print(f"Wrote {len(paths)} pages to {args.dest}")
+        return 0
+    
+    if args.command == "compare":
+        return report(load_results(args.baseline), load_results(args.current), args.threshold)
+    
+    if args.command == "stress":
+        slow, table = check_stress(run_stress(args.size_kb * 1024, args.repeat), args.max_ms_per_kb)
+        print(table)
+        if slow:
+            print(f"Too slow: {', '.join(slow)}")
+            return 1
+        return 0
+    
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        paths = generate_corpus(corpus_dir, args.pages, args.mix, args.size, args.seed)
+        results = run_benchmark(paths, args.template, args.repeat)
+    results["meta"].update({"mix": args.mix, "size": args.size, "seed": args.seed})
+    
+    output = json.dumps(results, indent=1)
+    if args.out:
+        with open(args.out, 'w') as file:
+            file.write(output)
+    else:
+        print(output)
+        
+    if args.baseline:
+        return report(load_results(args.baseline), results, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import os
+import random
+
+WORDS = ("middle", "earth", "ring", "shire", "wizard", "elven", "dwarf", "mountain", "river", "forest",
+         "journey", "fellowship", "tower", "king", "return", "shadow", "light", "road", "song", "stone")
+
+#content mixes supported by the corpus generator, "mixed" cycles through the regular ones
+REGULAR_MIXES = ("paragraphs", "quotes", "lists", "code", "small")
+#"pathological" is adversarial input for the parsers, it is kept out of "mixed" so existing mixed corpora do not change
+MIXES = REGULAR_MIXES + ("mixed", "pathological")
+
+
+def sentence(rng, words=12):
+    #a sentence with some inline markup, so the inline tokenizer has work to do
+    parts = []
+    for index in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.05:
+            word = f"**{word}**"
+        elif roll < 0.10:
+            word = f"*{word}*"
+        elif roll < 0.13:
+            word = f"`{word}`"
+        elif roll < 0.15:
+            word = f"[{word}](https://example.com/{word})"
+        elif roll < 0.16:
+            word = f"![{word}](/images/{word}.png)"
+        parts.append(word)
+    return " ".join(parts).capitalize() + "."
+
+
+def long_paragraphs(rng, size):
+    blocks = []
+    for _ in range(size):
+        blocks.append(" ".join(sentence(rng, 20) for _ in range(30)))
+    return blocks
+
+
+def deep_quotes(rng, size, depth=6):
+    #quotes nested depth levels deep ("> > > ..."), every level holding a paragraph and a list before the next level
+    blocks = []
+    for _ in range(size):
+        lines = []
+        for level in range(1, depth + 1):
+            marker = "> " * level
+            #a marker line without content ends the current block of its level
+            separator = marker.rstrip()
+            lines.extend([f"{marker}{sentence(rng)}", f"{marker}{sentence(rng)}", separator])
+            lines.extend([f"{marker}* {sentence(rng, 6)}", f"{marker}* {sentence(rng, 6)}", separator])
+        blocks.append("\n".join(lines[:-1]))
+    return blocks
+
+
+def huge_lists(rng, size):
+    blocks = []
+    for _ in range(size):
+        blocks.append("\n".join(f"* {sentence(rng, 8)}" for _ in range(200)))
+        blocks.append("\n".join(f"{index + 1}. {sentence(rng, 8)}" for index in range(200)))
+    return blocks
+
+
+def code_heavy(rng, size):
+    blocks = []
+    for index in range(size * 10):
+        code_lines = [f"def {rng.choice(WORDS)}_{line}():" if line % 5 == 0 else f"    return \"{rng.choice(WORDS)}\""
+                      for line in range(20)]
+        blocks.append("```\n" + "\n".join(code_lines) + "\n```")
+        blocks.append(sentence(rng))
+    return blocks
+
+
+def small_page(rng, size):
+    return [sentence(rng, 10)]
+
+
+def pathological(rng, size):
+    #unmatched brackets, separators and delimiters by the thousand, links missing their ")" and deeply nested quotes
+    word = rng.choice(WORDS)
+    return [
+        "[" * 2000,
+        "![" * 1000,
+        "](" * 1000,
+        f"[{word}](" * 500,
+        f"**{word}" * 500 + "*",
+        f"`{word}" * 500,
+        "\n".join(["> " * 200 + word] * 2),
+    ]
+
+
+GENERATORS = {
+    "paragraphs": long_paragraphs,
+    "quotes": deep_quotes,
+    "lists": huge_lists,
+    "code": code_heavy,
+    "small": small_page,
+    "pathological": pathological,
+}
+
+
+def generate_page_text(rng, mix, size):
+    #a markdown document of the given mix, size scales the number of blocks
+    if mix == "mixed":
+        mix = rng.choice(REGULAR_MIXES)
+    blocks = [f"# {sentence(rng, 5)[:-1]}"]
+    for _ in range(size):
+        blocks.append(f"## {sentence(rng, 4)[:-1]}")
+        blocks.extend(GENERATORS[mix](rng, 1))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(dest_dir, pages=100, mix="mixed", size=3, seed=0, pages_per_dir=50):
+    #writing a reproducible content tree: the same arguments always produce the same files
+    if mix not in MIXES:
+        raise ValueError(f"Unknown content mix {mix}, expected one of {', '.join(MIXES)}")
+    
+    rng = random.Random(seed)
+    paths = []
+    for index in range(pages):
+        dir_path = os.path.join(dest_dir, f"section{index // pages_per_dir}")
+        os.makedirs(dir_path, exist_ok=True)
+        path = os.path.join(dir_path, f"page{index}.md")
+        with open(path, 'w') as file:
+            file.write(generate_page_text(rng, mix, size))
+        paths.append(path)
+    return paths
@@ -0,0 +1,167 @@
+import os
+import platform
+import sys
+import tempfile
+import time
+from markdown_functions import (markdown_to_blocks, block_to_block_type, text_to_textnodes, markdown_to_html_node,
+                                extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link)
+from template import Template
+from textnode import TextNode
+from block_cache import block_cache
+
+#stages timed by the benchmark, in pipeline order
+STAGES = ("read", "markdown_to_blocks", "block_to_block_type", "text_to_textnodes",
+          "markdown_to_html_node", "to_html", "template", "write")
+
+#adversarial inputs for the parsers, each building a text of about size characters
+STRESS_INPUTS = {
+    "unmatched_brackets": lambda size: "[" * size,
+    "unmatched_images": lambda size: "![" * (size // 2),
+    "unmatched_separators": lambda size: "](" * (size // 2),
+    "brackets_before_separator": lambda size: "[" * (size - 2) + "](",
+    "unclosed_links": lambda size: "[a](" * (size // 4),
+    "unmatched_stars": lambda size: "**a" * (size // 3) + "*",
+    "unmatched_backticks": lambda size: "`a" * (size // 2),
+    "nested_quotes": lambda size: "\n".join(["> " * (size // 4) + "a"] * 2),
+}
+#parsing time allowed per KB of adversarial input, a quadratic parser is already hundreds of times slower on 16KB
+STRESS_MAX_MS_PER_KB = 20.0
+
+
+def best_time(func, repeat, setup=None):
+    #running func repeat times and keeping the fastest run, the least disturbed by the rest of the machine
+    #setup runs before every run, outside of the timing
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_benchmark(paths, template_path, repeat=3):
+    #timing every stage separately over the same pages, each stage gets the output of the previous one as input
+    template = Template.load(template_path)
+    timings = {}
+    
+    def read():
+        contents = []
+        for path in paths:
+            with open(path, 'r') as file:
+                contents.append(file.read())
+        return contents
+    
+    timings["read"] = best_time(read, repeat)
+    sources = read()
+    total_bytes = sum(len(source.encode()) for source in sources)
+    
+    timings["markdown_to_blocks"] = best_time(lambda: [markdown_to_blocks(source) for source in sources], repeat)
+    blocks = [block for source in sources for block in markdown_to_blocks(source)]
+    
+    timings["block_to_block_type"] = best_time(lambda: [block_to_block_type(block) for block in blocks], repeat)
+    paragraphs = [block for block in blocks if block_to_block_type(block) == "paragraph"]
+    
+    timings["text_to_textnodes"] = best_time(lambda: [text_to_textnodes(block) for block in paragraphs], repeat)
+    
+    #the block cache is cleared before every run, so each run parses the corpus like a fresh build
+    timings["markdown_to_html_node"] = best_time(lambda: [markdown_to_html_node(source) for source in sources], repeat,
+                                                 setup=block_cache.clear)
+    block_cache.clear()
+    nodes = [markdown_to_html_node(source) for source in sources]
+    cache_stats = block_cache.stats()
+    
+    timings["to_html"] = best_time(lambda: [node.to_html() for node in nodes], repeat)
+    html_pages = [node.to_html() for node in nodes]
+    
+    def fill_template():
+        return [template.render({"Title": "Benchmark", "Content": html}) for html in html_pages]
+    
+    timings["template"] = best_time(fill_template, repeat)
+    pages = fill_template()
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        def write():
+            for index, page in enumerate(pages):
+                with open(os.path.join(output_dir, f"page{index}.html"), 'w') as file:
+                    file.write(page)
+                    
+        timings["write"] = best_time(write, repeat)
+    
+    stages = {}
+    for stage in STAGES:
+        seconds = timings[stage]
+        stages[stage] = {
+            "seconds": seconds,
+            "pages_per_second": len(paths) / seconds if seconds else None,
+            "mb_per_second": total_bytes / 1e6 / seconds if seconds else None,
+        }
+    
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "pages": len(paths),
+            "bytes": total_bytes,
+            "repeat": repeat,
+            "block_cache": cache_stats,
+        },
+        "stages": stages,
+    }
+
+
+def parse_everything(text):
+    #every parser of the pipeline on the same text: blocks and inline nodes, the image and link extraction and splitting
+    markdown_to_html_node(text).to_html()
+    extract_markdown_images(text)
+    extract_markdown_links(text)
+    split_nodes_image(split_nodes_link([TextNode(text, "text")]))
+
+
+def run_stress(size=64 * 1024, repeat=3):
+    #timing the parsers on every adversarial input, returning {input name: milliseconds per KB of input}
+    #the parsers are linear, so the time per KB should not grow with size
+    results = {}
+    for name, make_input in STRESS_INPUTS.items():
+        text = make_input(size)
+        seconds = best_time(lambda: parse_everything(text), repeat, setup=block_cache.clear)
+        results[name] = seconds * 1000 / (len(text) / 1024)
+    block_cache.clear()
+    return results
+
+
+def check_stress(results, max_ms_per_kb=STRESS_MAX_MS_PER_KB):
+    #returning the inputs parsed slower than max_ms_per_kb, and a printable report
+    slow = []
+    lines = [f"{'input':<28}{'ms/KB':>10}"]
+    for name, ms_per_kb in results.items():
+        flag = ""
+        if ms_per_kb > max_ms_per_kb:
+            slow.append(name)
+            flag = "  TOO SLOW"
+        lines.append(f"{name:<28}{ms_per_kb:>10.3f}{flag}")
+        
+    return slow, "\n".join(lines)
+
+
+def compare_results(baseline, current, threshold=0.10):
+    #returning the stages that got slower than the baseline by more than threshold (0.10 means 10%), and a printable report
+    regressions = []
+    lines = [f"{'stage':<24}{'baseline':>12}{'current':>12}{'change':>10}"]
+    
+    for stage in STAGES:
+        if stage not in baseline["stages"] or stage not in current["stages"]:
+            continue
+        old = baseline["stages"][stage]["seconds"]
+        new = current["stages"][stage]["seconds"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(stage)
+            flag = "  REGRESSION"
+        lines.append(f"{stage:<24}{old * 1000:>10.2f}ms{new * 1000:>10.2f}ms{change:>+10.1%}{flag}")
+        
+    return regressions, "\n".join(lines)
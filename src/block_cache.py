@@ -0,0 +1,100 @@
+import sys
+from collections import OrderedDict
+from htmlnode import HTMLNode
+
+
+def node_size(node):
+    #approximate memory held by a node tree: the nodes with their values, props and children lists
+    size = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        size += sys.getsizeof(node)
+        if node.value is not None:
+            size += sys.getsizeof(node.value)
+        if node.props:
+            size += sys.getsizeof(node.props) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in node.props.items())
+        if node.children is not None:
+            size += sys.getsizeof(node.children)
+            stack.extend(node.children)
+    return size
+
+
+class RenderedNode(HTMLNode):
+    #a block node along with its rendered html: it keeps the tag and children of the original node, but never renders them again
+    #the children stay alive for the search index, which reads the text of every node
+    __slots__ = ("html", "size")
+    
+    def __init__(self, node, html):
+        super().__init__(tag=node.tag, value=node.value, children=node.children, props=node.props)
+        self.html = html
+        #memory held by the node, its html and the children it keeps alive
+        self.size = node_size(self) + sys.getsizeof(html)
+        
+        
+    def iter_html(self):
+        yield self.html
+        
+        
+    def to_html(self):
+        return self.html
+
+
+class BlockCache:
+    #bounded LRU cache mapping the text of a markdown block to its rendered node, shared by every page of a build
+    #the memory cap counts the bytes of the cached block texts, their html and their node trees, 0 disables the cache
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        
+        
+    def get(self, block):
+        node = self.entries.get(block)
+        if node is None:
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(block)
+        self.hits += 1
+        return node
+    
+    
+    def put(self, block, node):
+        #rendering the node once, and returning the rendered node to use in place of the original one
+        if self.max_bytes <= 0:
+            return node
+        
+        rendered = RenderedNode(node, node.to_html())
+        entry_size = sys.getsizeof(block) + rendered.size
+        if entry_size > self.max_bytes:
+            return rendered
+        
+        if block in self.entries:
+            self.size -= sys.getsizeof(block) + self.entries.pop(block).size
+        self.entries[block] = rendered
+        self.size += entry_size
+        
+        #evicting the least recently used blocks until the cache fits its memory cap again
+        while self.size > self.max_bytes:
+            old_block, old_node = self.entries.popitem(last=False)
+            self.size -= sys.getsizeof(old_block) + old_node.size
+            
+        return rendered
+    
+    
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        
+        
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+
+#cache used by markdown_to_html_node, each build process has its own
+block_cache = BlockCache()
@@ -0,0 +1,80 @@
+import json
+import os
+from manifest import hash_file
+from output import is_temp_name
+
+
+def scan_outputs(public_dir, exclude=()):
+    #yielding (path relative to public_dir with / separators, stat) for every file of the output
+    #temporary files of an interrupted write are not part of it
+    if not os.path.isdir(public_dir):
+        return
+    stack = [public_dir]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and os.path.normpath(entry.path) not in exclude and not is_temp_name(entry.name):
+                    yield os.path.relpath(entry.path, public_dir).replace(os.sep, "/"), entry.stat()
+
+
+class OutputChanges:
+    #comparing the output directory with the state saved by the previous build, to list the added, modified and deleted files
+    #files whose size and modification time did not change are not read again, unchanged writes keep the modification time,
+    #so only the files that really changed are hashed
+    def __init__(self, state_path, public_dir):
+        self.state_path = state_path
+        self.public_dir = public_dir
+        self.previous_files = {}
+        if os.path.exists(state_path):
+            try:
+                with open(state_path, 'r') as file:
+                    self.previous_files = json.load(file)["files"]
+            except (OSError, ValueError, KeyError):
+                self.previous_files = {}
+        self.files = {}
+
+
+    def compute(self, exclude=()):
+        #returning {"added": [...], "modified": [...], "deleted": [...]}, lists of {"path", "sha256"} sorted by path
+        changes = {"added": [], "modified": [], "deleted": []}
+        exclude = {os.path.normpath(path) for path in exclude}
+        for path, stat in scan_outputs(self.public_dir, exclude):
+            previous = self.previous_files.get(path)
+            if previous is not None and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+                self.files[path] = previous
+                continue
+
+            file_hash = hash_file(os.path.join(self.public_dir, path))
+            self.files[path] = [stat.st_size, stat.st_mtime_ns, file_hash]
+            if previous is None:
+                changes["added"].append({"path": path, "sha256": file_hash})
+            elif previous[2] != file_hash:
+                changes["modified"].append({"path": path, "sha256": file_hash})
+
+        for path in sorted(set(self.previous_files) - set(self.files)):
+            changes["deleted"].append({"path": path, "sha256": self.previous_files[path][2]})
+
+        for paths in changes.values():
+            paths.sort(key=lambda change: change["path"])
+        return changes
+
+
+    def save(self):
+        state_directory = os.path.dirname(self.state_path)
+        if state_directory:
+            os.makedirs(state_directory, exist_ok=True)
+        with open(self.state_path, 'w') as file:
+            json.dump({"files": self.files}, file)
+
+
+def write_changes(changes_path, public_dir, state_path):
+    #listing the output changes since the previous build that wrote a changes file, returning them
+    output_changes = OutputChanges(state_path, public_dir)
+    changes = output_changes.compute(exclude=[changes_path])
+    with open(changes_path, 'w') as file:
+        json.dump(changes, file, indent=2)
+        file.write("\n")
+    output_changes.save()
+    return changes
@@ -0,0 +1,94 @@
+import bz2
+import gzip
+import lzma
+import os
+from concurrent.futures import ThreadPoolExecutor
+from output import atomic_open
+
+#compressed siblings written next to every output file, as served by nginx gzip_static and most CDNs
+#xz defaults to preset 6, higher presets need hundreds of MB of memory per compressing thread
+FORMATS = {
+    "gz": (lambda data, level: gzip.compress(data, compresslevel=level, mtime=0), 9),
+    "xz": (lambda data, level: lzma.compress(data, preset=level), 6),
+    "bz2": (lambda data, level: bz2.compress(data, compresslevel=level), 9),
+}
+#binary formats (images, fonts, archives...) are already compressed
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".md", ".map", ".csv", ".ico", ".wasm"}
+
+
+def parse_formats(value):
+    #parsing a comma separated list of formats, as given on the command line
+    formats = [name.strip() for name in value.split(",") if name.strip()]
+    for name in formats:
+        if name not in FORMATS:
+            raise ValueError(f"Unknown compression format: {name} (expected one of {', '.join(FORMATS)})")
+    return formats
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compressed_up_to_date(path, compressed_path, stat=None):
+    #compressed siblings get the modification time of their source, so a different time means a changed source
+    if stat is None:
+        stat = os.stat(path)
+    try:
+        return os.stat(compressed_path).st_mtime_ns == stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path, formats, level=None):
+    #writing the missing or outdated compressed siblings of a file, returning their paths
+    stat = os.stat(path)
+    data = None
+    written = []
+    for name in formats:
+        compressed_path = f"{path}.{name}"
+        if compressed_up_to_date(path, compressed_path, stat):
+            continue
+
+        if data is None:
+            with open(path, 'rb') as file:
+                data = file.read()
+        compress, default_level = FORMATS[name]
+        with atomic_open(compressed_path, 'wb') as file:
+            file.write(compress(data, default_level if level is None else level))
+        os.utime(compressed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        written.append(compressed_path)
+    return written
+
+
+def remove_compressed(path, formats=FORMATS):
+    #removing the compressed siblings of an output file that was deleted
+    for name in formats:
+        if os.path.exists(f"{path}.{name}"):
+            os.remove(f"{path}.{name}")
+
+
+class Compressor:
+    #compressing output files in a pool of threads while the build goes on, zlib, lzma and bz2 release the GIL while they work
+    def __init__(self, formats, level=None, workers=None):
+        self.formats = formats
+        self.level = level
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.futures = []
+
+
+    def submit(self, path):
+        if is_compressible(path):
+            self.futures.append((path, self.pool.submit(compress_file, path, self.formats, self.level)))
+
+
+    def close(self):
+        #waiting for every submitted file, returning the number of compressed files written
+        written = 0
+        for path, future in self.futures:
+            try:
+                written += len(future.result())
+            except Exception as e:
+                print(f"An error occurred while compressing {path}: {str(e)}")
+        self.pool.shutdown()
+        self.futures = []
+        return written
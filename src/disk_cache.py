@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import time
+from block_cache import RenderedNode
+from htmlnode import LeafNode, ParentNode
+from manifest import GENERATOR_VERSION, hash_bytes
+
+
+def encode_node(node):
+    #an HTMLNode tree as plain JSON data: [tag, value, props, children (None for a leaf), rendered html (None if not rendered)]
+    children = None if node.children is None else [encode_node(child) for child in node.children]
+    html = node.html if isinstance(node, RenderedNode) else None
+    return [node.tag, node.value, node.props, children, html]
+
+
+def decode_node(data):
+    #the tree of encode_node, raising ValueError (or TypeError) on anything it could not have written
+    tag, value, props, children, html = data
+    if not (tag is None or isinstance(tag, str)) or not (props is None or isinstance(props, dict)):
+        raise ValueError("Invalid node")
+    if children is None:
+        if not isinstance(value, str):
+            raise ValueError("Invalid leaf node")
+        node = LeafNode(tag, value, props)
+    else:
+        node = ParentNode(tag, [decode_node(child) for child in children], props)
+    if html is not None:
+        if not isinstance(html, str):
+            raise ValueError("Invalid rendered node")
+        node = RenderedNode(node, html)
+    return node
+
+
+class DiskCache:
+    #persistent cache mapping the content of a markdown document to its title and HTMLNode tree
+    #the tree holds the rendered html of every block (block cache nodes), so a cached page is streamed without being parsed,
+    #and without building the html of the whole page in a single string
+    #entries are keyed by the content hash and the generator version, so a generator change never reuses stale html
+    #trees are stored as plain JSON, never as pickles: the database can come from a shared CI cache, and an entry that
+    #cannot be decoded (written by another version, or damaged) is a miss instead of a failed page
+    #the connection is opened lazily and not pickled, so the cache can be sent to worker processes
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = None
+        #key -> time of the last use, written in a single transaction by flush_used instead of a write on every hit
+        self.used = {}
+
+
+    def __getstate__(self):
+        return {"path": self.path, "max_bytes": self.max_bytes, "connection": None, "used": {}}
+
+
+    def connect(self):
+        if self.connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            #several worker processes can use the cache at the same time, WAL lets readers and a writer work concurrently
+            #the async build driver renders in a helper thread, then the main thread evicts: one thread at a time uses the connection
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, title TEXT, tree BLOB, size INTEGER, used REAL)"
+            )
+        return self.connection
+
+
+    def key(self, content):
+        return f"{GENERATOR_VERSION}:{hash_bytes(content.encode())}"
+
+
+    def get(self, content):
+        #returning (title or None, HTMLNode tree) for a document that was already rendered, or None
+        #a hit is only a read, worker processes never wait for each other on the database lock
+        row = self.connect().execute("SELECT title, tree FROM pages WHERE key = ?", (self.key(content),)).fetchone()
+        if row is None:
+            return None
+        title, tree = row
+        try:
+            if not (title is None or isinstance(title, str)):
+                raise ValueError("Invalid title")
+            return title, decode_node(json.loads(tree))
+        except (ValueError, TypeError, RecursionError):
+            return None
+
+
+    def put(self, content, title, node):
+        #title is None (NULL) for a document without h1
+        try:
+            tree = json.dumps(encode_node(node), separators=(",", ":"))
+        except RecursionError:
+            #too deeply nested to be stored, the page is rendered again by the next build
+            return
+        size = len(tree.encode()) + len((title or "").encode())
+        connection = self.connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO pages (key, title, tree, size, used) VALUES (?, ?, ?, ?, ?)",
+                (self.key(content), title, tree, size, time.time()),
+            )
+
+
+    def mark_used(self, content):
+        #recording that a document was used by this build, the building process calls it for every page it renders
+        self.used[self.key(content)] = time.time()
+
+
+    def flush_used(self):
+        #writing the recorded uses, so eviction keeps the documents of the latest builds
+        if self.used:
+            connection = self.connect()
+            with connection:
+                connection.executemany("UPDATE pages SET used = ? WHERE key = ?", [(used, key) for key, used in self.used.items()])
+            self.used = {}
+
+
+    def total_size(self):
+        return self.connect().execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+
+    def evict(self):
+        #removing the least recently used entries until the cache fits its size limit again, returning how many were removed
+        self.flush_used()
+        connection = self.connect()
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        removed = []
+        for key, size in connection.execute("SELECT key, size FROM pages ORDER BY used, rowid"):
+            if excess <= 0:
+                break
+            removed.append((key,))
+            excess -= size
+
+        with connection:
+            connection.executemany("DELETE FROM pages WHERE key = ?", removed)
+        return len(removed)
+
+
+    def close(self):
+        self.flush_used()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+    def clear(self):
+        #deleting the cache database along with its WAL files
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
@@ -0,0 +1,47 @@
+import re
+from markdown_functions import scan_blocks, blocks_to_html_node, heading_title, HEADING_PATTERN
+
+#block markers at the start of a line (headings, list items, quotes, possibly nested), they are not words of the text
+BLOCK_MARKER_PATTERN = re.compile(r"^[ \t]*(?:(?:#{1,6}|[*-]|\d+\.|>)(?:[ \t]+|$))+", re.MULTILINE)
+
+
+class Document:
+    #a markdown document parsed once, with everything the build needs from it
+    def __init__(self, blocks, node, title, headings, word_count):
+        #list of (block_type, block) tuples, in document order
+        self.blocks = blocks
+        #HTMLNode tree of the whole document
+        self.node = node
+        #text of the first h1 heading, None if there is no h1 heading
+        self.title = title
+        #list of (level, text) tuples for every heading
+        self.headings = headings
+        self.word_count = word_count
+        
+        
+    def require_title(self):
+        if self.title is None:
+            raise Exception("No header was found")
+        return self.title
+        
+        
+def parse_document(markdown):
+    #splitting the document into blocks a single time, and deriving the tree, the title and the metadata from those blocks
+    blocks = list(scan_blocks(markdown))
+    title = None
+    headings = []
+    word_count = 0
+    
+    for block_type, block in blocks:
+        if block_type == "heading":
+            level = len(HEADING_PATTERN.match(block).group()) - 1
+            headings.append((level, block[level + 1:].strip()))
+            if title is None:
+                title = heading_title(block)
+        if block_type == "paragraph":
+            word_count += len(block.split())
+        elif block_type != "code":
+            word_count += len(BLOCK_MARKER_PATTERN.sub("", block).split())
+    
+    node = blocks_to_html_node(blocks)
+    return Document(blocks, node, title, headings, word_count)
@@ -0,0 +1,171 @@
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+from output import atomic_open, same_content
+
+#the sitemap protocol allows at most 50,000 urls per sitemap file
+SITEMAP_MAX_URLS = 50000
+SITEMAP_PART_PATTERN = re.compile(r"sitemap-(\d+)\.xml(\.\w+)?$")
+
+
+def absolute_url(base_url, url):
+    return base_url.rstrip("/") + url
+
+
+def page_datetime(metadata, src_path):
+    #the date from the front matter, or the modification time of the source file
+    #dates without an offset are read as UTC, an explicit offset is kept
+    date = metadata.get("date")
+    if date is not None:
+        try:
+            parsed = datetime.fromisoformat(str(date))
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(os.path.getmtime(src_path), timezone.utc)
+
+
+class SitemapWriter:
+    #writing sitemap files one url at a time, starting a new file every max_urls urls
+    #a single file is written as sitemap.xml, several files are listed by a sitemap index in sitemap.xml
+    def __init__(self, public_dir, base_url, max_urls=SITEMAP_MAX_URLS):
+        self.public_dir = public_dir
+        self.base_url = base_url
+        self.max_urls = max_urls
+        self.parts = 0
+        self.count = 0
+        self.file = None
+
+
+    def part_path(self, number):
+        return os.path.join(self.public_dir, f"sitemap-{number}.xml")
+
+
+    def add(self, url, lastmod=None):
+        if self.file is None or self.count == self.max_urls:
+            self.close_part()
+            self.parts += 1
+            self.count = 0
+            self.file = atomic_open(self.part_path(self.parts), 'w')
+            self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            self.file.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+        self.file.write(f"<url><loc>{escape(absolute_url(self.base_url, url))}</loc>")
+        if lastmod is not None:
+            self.file.write(f"<lastmod>{lastmod.date().isoformat()}</lastmod>")
+        self.file.write("</url>\n")
+        self.count += 1
+
+
+    def close_part(self):
+        if self.file is not None:
+            self.file.write("</urlset>\n")
+            self.file.close()
+            self.file = None
+
+
+    def close(self):
+        #returning the paths of the sitemap files
+        self.close_part()
+        sitemap_path = os.path.join(self.public_dir, "sitemap.xml")
+
+        if self.parts <= 1:
+            if self.parts == 1:
+                if same_content(self.part_path(1), sitemap_path):
+                    os.remove(self.part_path(1))
+                else:
+                    os.replace(self.part_path(1), sitemap_path)
+            else:
+                with atomic_open(sitemap_path, 'w') as file:
+                    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                    file.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n</urlset>\n')
+        else:
+            with atomic_open(sitemap_path, 'w') as file:
+                file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+                file.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+                for number in range(1, self.parts + 1):
+                    file.write(f"<sitemap><loc>{escape(absolute_url(self.base_url, f'/sitemap-{number}.xml'))}</loc></sitemap>\n")
+                file.write("</sitemapindex>\n")
+
+        #removing the parts left over by a previous build with more pages, along with their compressed siblings
+        kept_parts = self.parts if self.parts > 1 else 0
+        for file_name in os.listdir(self.public_dir):
+            match = SITEMAP_PART_PATTERN.match(file_name)
+            if match and int(match.group(1)) > kept_parts:
+                os.remove(os.path.join(self.public_dir, file_name))
+                
+        return [sitemap_path] + [self.part_path(number) for number in range(1, kept_parts + 1)]
+
+
+class AtomWriter:
+    #writing an Atom feed, entries are kept in the order the pages are walked
+    #the feed <updated> is the date of the newest entry, so a build without changes writes the same feed again
+    #entries follow the feed metadata in an Atom document, so they are spooled to a temporary file until that date is known,
+    #and copied after the metadata at close: memory stays flat no matter how many pages the site has
+    def __init__(self, path, base_url, title, author=None):
+        self.path = path
+        self.base_url = base_url
+        self.title = title
+        #RFC 4287 requires an author on the feed when entries have none
+        self.author = author or title
+        self.spool = None
+        self.updated = None
+
+
+    def add(self, url, title, updated):
+        if self.spool is None:
+            self.spool = tempfile.TemporaryFile('w+', encoding="utf-8")
+        link = escape(absolute_url(self.base_url, url))
+        self.spool.write(
+            f"<entry><title>{escape(title or url)}</title>"
+            f'<link href="{link}"/><id>{link}</id>'
+            f"<updated>{updated.replace(microsecond=0).isoformat()}</updated></entry>\n"
+        )
+        if self.updated is None or updated > self.updated:
+            self.updated = updated
+
+
+    def close(self):
+        #an empty feed gets a fixed date, the epoch
+        updated = self.updated or datetime.fromtimestamp(0, timezone.utc)
+        try:
+            with atomic_open(self.path, 'w') as file:
+                file.write('<?xml version="1.0" encoding="utf-8"?>\n')
+                file.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+                file.write(f"<title>{escape(self.title)}</title>\n")
+                file.write(f'<link href="{escape(absolute_url(self.base_url, "/"))}"/>\n')
+                file.write(f'<link rel="self" href="{escape(absolute_url(self.base_url, "/atom.xml"))}"/>\n')
+                file.write(f"<id>{escape(absolute_url(self.base_url, '/'))}</id>\n")
+                file.write(f"<author><name>{escape(self.author)}</name></author>\n")
+                file.write(f"<updated>{updated.replace(microsecond=0).isoformat()}</updated>\n")
+                if self.spool is not None:
+                    self.spool.seek(0)
+                    shutil.copyfileobj(self.spool, file)
+                file.write("</feed>\n")
+        finally:
+            if self.spool is not None:
+                self.spool.close()
+                self.spool = None
+
+
+class FeedWriter:
+    #page listener for generate_pages_recursive, adding every published page to the sitemap and the Atom feed
+    def __init__(self, public_dir, base_url, title, author=None):
+        self.sitemap = SitemapWriter(public_dir, base_url)
+        self.atom = AtomWriter(os.path.join(public_dir, "atom.xml"), base_url, title, author)
+
+
+    def __call__(self, entry):
+        updated = page_datetime(entry["metadata"], entry["src"])
+        self.sitemap.add(entry["url"], updated)
+        self.atom.add(entry["url"], entry["title"], updated)
+
+
+    def close(self):
+        #returning the paths of the files that were written
+        self.atom.close()
+        return self.sitemap.close() + [self.atom.path]
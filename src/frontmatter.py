@@ -0,0 +1,91 @@
+import re
+
+#a YAML-lite subset: "key: value" lines between two "---" lines at the very top of the document
+#values can be quoted or plain strings, integers, booleans, inline lists ([a, b]) or block lists ("- item" lines)
+KEY_PATTERN = re.compile(r"([A-Za-z_][\w-]*)\s*:(.*)$")
+BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+#keys whose value is always a string, so "title: 1984" is the title "1984" and not a number
+STRING_KEYS = {"title", "template"}
+
+
+def parse_string(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.lower() in BOOLEANS:
+        return BOOLEANS[value.lower()]
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    return value
+
+
+def parse_value(value):
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        inner = value[1:-1].strip()
+        if not inner:
+            return []
+        return [parse_scalar(item) for item in inner.split(",")]
+    return parse_scalar(value)
+
+
+def split_front_matter(text):
+    #returning (front matter lines, body), front matter lines is None when the document has no front matter
+    if not (text.startswith("---\n") or text.startswith("---\r\n")):
+        return None, text
+
+    lines = text.splitlines(keepends=True)
+    for index in range(1, len(lines)):
+        if lines[index].rstrip() == "---":
+            return [line.rstrip("\r\n") for line in lines[1:index]], "".join(lines[index + 1:])
+
+    #no closing line, this is not front matter but a document starting with a horizontal rule
+    return None, text
+
+
+def parse_front_matter(text):
+    #returning (metadata dict, markdown body without the front matter)
+    #the block between the rules is only front matter when every line in it is a key, a list item, a comment or blank,
+    #otherwise the document starts with a horizontal rule and is returned whole
+    lines, body = split_front_matter(text)
+    if lines is None:
+        return {}, text
+
+    metadata = {}
+    current_list = None
+    for line in lines:
+        stripped_line = line.strip()
+        if not stripped_line or stripped_line.startswith("#"):
+            continue
+
+        if stripped_line.startswith("- ") and current_list is not None:
+            current_list.append(parse_scalar(stripped_line[2:]))
+            continue
+
+        match = KEY_PATTERN.match(stripped_line)
+        if match is None:
+            return {}, text
+
+        key, value = match.group(1), match.group(2)
+        if key in STRING_KEYS:
+            metadata[key] = parse_string(value)
+            current_list = None
+        elif value.strip():
+            metadata[key] = parse_value(value)
+            current_list = None
+        else:
+            #an empty value starts a block list, filled by the "- item" lines that follow
+            current_list = []
+            metadata[key] = current_list
+
+    if not metadata:
+        #rules around blank lines or comments only
+        return {}, text
+    return metadata, body
@@ -1,86 +1,382 @@
 import os
-import shutil
-from markdown_functions import markdown_to_html_node, extract_title
-from pathlib import Path
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from document import parse_document
+from manifest import hash_bytes, hash_file
+from frontmatter import parse_front_matter
+from template import Template
+from output import DiskOutput
+from site_index import page_url
+from search_index import tokenize
+import tracing
 
-def copy_contents(from_path, dest_path):
+#number of pages sent to a worker process at once
+PAGE_CHUNK_SIZE = 8
+
+def copy_contents(from_path, dest_path, output=None):
     #copy contents from one dir to another, deleting the destination dir, if it exists
+    if output is None:
+        output = DiskOutput()
     try:
         if os.path.exists(from_path):   
             src_list = os.listdir(from_path)        
             
-        if os.path.exists(dest_path):
-            shutil.rmtree(dest_path)
-            os.mkdir(dest_path)
-        else:
-            os.mkdir(dest_path)
+        output.rmtree(dest_path)
+        output.makedirs(dest_path)
         
         for item in src_list:
             item_path = os.path.join(from_path, item)
             
             if os.path.isfile(item_path):
-                shutil.copy(item_path, dest_path)
+                output.copy_file(item_path, os.path.join(dest_path, item))
                 
             elif os.path.isdir(item_path):
                 new_src_path = os.path.join(from_path, item)
                 new_dest_path = os.path.join(dest_path, item)
                 
-                os.mkdir(new_dest_path)
-                copy_contents(new_src_path, new_dest_path)
+                output.makedirs(new_dest_path)
+                copy_contents(new_src_path, new_dest_path, output)
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         
-        
-def generate_page(from_path, template_path, dest_path):
-    #reading contents from a file, and creating an html page using a given template, to the destination dir
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
     
-    with open(from_path, 'r') as file:
-        content = file.read()
+def asset_up_to_date(from_path, dest_path, use_hash=False, output=None):
+    #comparing sizes first, then either the content hashes or the modification times
+    if output is None:
+        output = DiskOutput()
+    try:
+        dest_stat = output.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(from_path)
+    
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    
+    if use_hash:
+        if hash_file(from_path) != output.hash_file(dest_path):
+            return False
+        if src_stat.st_mtime_ns != dest_stat.st_mtime_ns:
+            output.copystat(from_path, dest_path)
+        return True
+    
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def sync_contents(from_path, dest_path, manifest=None, use_hash=False, link=False, compressor=None, output=None):
+    #copying only new and changed files from one dir to another, without deleting anything else in the destination
+    #assets are recorded in the build manifest, so the ones whose source was deleted are removed by manifest.remove_stale()
+    #with a compressor, every destination file is handed to it, and it skips those whose compressed siblings are up to date
+    #returns the list of destination files that were copied
+    if output is None:
+        output = DiskOutput()
+    copied = []
+    try:
+        for dir_path, dir_names, file_names in os.walk(from_path):
+            dir_names.sort()
+            relative_dir = os.path.relpath(dir_path, from_path)
+            dest_dir = os.path.normpath(os.path.join(dest_path, relative_dir))
+            output.makedirs(dest_dir)
+            
+            for file_name in sorted(file_names):
+                item_path = os.path.join(dir_path, file_name)
+                item_dest_path = os.path.join(dest_dir, file_name)
+                
+                if not asset_up_to_date(item_path, item_dest_path, use_hash, output):
+                    with tracing.span("copy", path=item_path):
+                        output.copy_file(item_path, item_dest_path, link)
+                    copied.append(item_dest_path)
+                    
+                if manifest is not None:
+                    manifest.record_asset(item_path, item_dest_path)
+                if compressor is not None:
+                    compressor.submit(item_dest_path)
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
         
-    with open(template_path, 'r') as file:
-        template = file.read()
+    return copied
         
-    title = extract_title(content)
         
-    html_node = markdown_to_html_node(content)
-    html_content = html_node.to_html()    
+def generate_page(from_path, template, dest_path, disk_cache=None, content=None, title=None, search_terms=None, output=None):
+    #reading contents from a file, and creating an html page using a given template, to the destination dir
+    #the template can be a compiled Template, or the path of a template file
+    #with a disk cache, documents that were already rendered by a previous build are not parsed again
+    #content and title can be given when the caller already read the file and its front matter
+    #when a search_terms dict is given, it is filled with the terms of the page text and their counts
+    #the page is written to output, the filesystem by default
+    #returns the title of the page
+    if output is None:
+        output = DiskOutput()
+    if not isinstance(template, Template):
+        template = Template.load(template)
+    print(f"Generating page from {from_path} to {dest_path} using {template.path}")
+    
+    title, page_content = render_content(from_path, disk_cache, content, title, search_terms)
     
-    html = template.replace("{{ Title }}", title) 
-    html = html.replace("{{ Content }}", html_content)
+    #the template segments and the html of the page are streamed straight to the file, without building the whole page in memory
+    #so rendering, template fill and writing are a single span
+    with tracing.span("render", path=dest_path):
+        with output.open(dest_path, 'w') as file:
+            template.write(file, {"Title": title, "Content": page_content})
+            
+    return title
+
+
+def render_content(from_path, disk_cache=None, content=None, title=None, search_terms=None):
+    #parsing a page (or getting it from the disk cache), returning (title, content) where content is an html string or an HTMLNode tree
+    #the arguments are the ones of generate_page
+    if content is None:
+        with tracing.span("read", path=from_path):
+            with open(from_path, 'r') as file:
+                content = file.read()
+        content = parse_front_matter(content)[1]
+    page_title = title
     
-    with open(dest_path, 'w') as file:
-        file.write(html)
+    cached = None
+    if disk_cache is not None:
+        with tracing.span("disk cache lookup", path=from_path):
+            cached = disk_cache.get(content)
+            
+    if cached is not None:
+        #the cached tree holds the html of every block, it is streamed like a freshly parsed one
+        #the cached title is None for a document without h1, which needs a title from the front matter as on a miss
+        title, page_content = cached
+        if title is None and page_title is None:
+            raise Exception("No header was found")
+        if search_terms is not None:
+            with tracing.span("tokenize", path=from_path):
+                search_terms.update(tokenize(page_content))
+    else:
+        with tracing.span("parse", path=from_path):
+            document = parse_document(content)
+            title = document.title if page_title is not None else document.require_title()
+            page_content = document.node
         
+        if search_terms is not None:
+            #the tree is already in memory, so the text is tokenized here instead of parsing the html again later
+            with tracing.span("tokenize", path=from_path):
+                search_terms.update(tokenize(document.node))
+            
+        if disk_cache is not None:
+            #the tree is stored, not the html of the page, so the page is still streamed to its file
+            with tracing.span("disk cache store", path=from_path):
+                disk_cache.put(content, title, page_content)
+                
+    #a title from the front matter takes precedence over the title of the document
+    if page_title is not None:
+        title = page_title
+    
+    return title, page_content
         
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    try:
-        if os.path.exists(dir_path_content):
-            content_list = os.listdir(dir_path_content)        
         
-        #iterating over directory entries.    
-        for entry in content_list:
-            entry_path = os.path.join(dir_path_content, entry)
-            entry_path_object = Path(entry_path)    
+def find_pages(dir_path_content, dest_dir_path, output=None):
+    #walking the content directory and yielding a (source, destination) pair for every md file, creating the destination directories on the way
+    #os.scandir gets the type of every entry from the directory listing itself, without a stat call per entry
+    #entries are sorted by name so pages come out in a stable order, only their names are held in memory, never the pages
+    with tracing.span("scan", path=dir_path_content):
+        with os.scandir(dir_path_content) as entries:
+            content_list = sorted((entry.name, entry.is_dir()) for entry in entries if entry.is_dir() or entry.is_file())
+    
+    for name, is_dir in content_list:
+        entry_path = os.path.join(dir_path_content, name)
+        
+        #If the entry is a directory, create the destination directory, and recursively walk it using the current entry path as a content path argument 
+        if is_dir:
+            new_dest_path = os.path.join(dest_dir_path, name)
+            (output or DiskOutput()).makedirs(new_dest_path)
+            yield from find_pages(entry_path, new_dest_path, output)
             
-            #If the entry is a an md file, we generate an html page
-            if entry_path_object.is_file():
-                filename = entry_path_object.name
-                
-                if filename.endswith(".md"):                    
-                    new_dest_path = os.path.join(dest_dir_path, entry)
-                    new_dest_path = new_dest_path.replace(".md", ".html")                   
-                    generate_page(entry_path, "./template.html", new_dest_path)
-             
-            #If the entry is a directory, create the directory path, the directories, and recursively call the function using the current entry path as a content path argument 
-            elif entry_path_object.is_dir():
-                new_dest_path = os.path.join(dest_dir_path, entry)                
-                os.makedirs(new_dest_path, exist_ok=True)           
-                generate_pages_recursive(entry_path, template_path, new_dest_path)
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        #If the entry is a an md file, it becomes a page to generate
+        elif name.endswith(".md"):
+            yield entry_path, os.path.join(dest_dir_path, name[:-len(".md")] + ".html")
 
 
+def render_page(job):
+    #generating a single page, returning the error message instead of raising, so one broken page does not stop the build
+    #returns (error message or None, title of the page, search terms or None, trace events recorded in a worker process)
+    from_path, template, dest_path, disk_cache, content, title, index_search, output = job
+    error = None
+    search_terms = {} if index_search else None
+    with tracing.span("page", path=from_path):
+        try:
+            title = generate_page(from_path, template, dest_path, disk_cache, content, title, search_terms, output)
+        except Exception as e:
+            error = str(e)
+    
+    if multiprocessing.parent_process() is not None:
+        return error, title, search_terms, tracing.take_events()
+    return error, title, search_terms, []
+
+
+def read_page(src_path, templates):
+    #reading a page source once, returning (metadata, markdown body, template, hash of every input of the page)
+    #templates maps template paths to (compiled template, template hash), page templates from the front matter are added to it
+    with tracing.span("read", path=src_path):
+        with open(src_path, 'rb') as file:
+            raw = file.read()
+    metadata, body = parse_front_matter(raw.decode())
+    
+    template_path = metadata.get("template")
+    if template_path is None:
+        return metadata, body, None, hash_bytes(raw)
+    
+    template_path = str(template_path)
+    if template_path not in templates:
+        templates[template_path] = (Template.load(template_path), hash_file(template_path))
+    template, template_hash = templates[template_path]
+    #the page template is part of the inputs of the page, so a change in it triggers a rebuild
+    return metadata, body, template, hash_bytes(raw + template_hash.encode())
+
 
+class PageRecorder:
+    #the per-page bookkeeping of a build (manifest, site index, search index and compressor), shared by every build driver
+    def __init__(self, dest_dir_path, manifest=None, site_index=None, search_index=None, compressor=None):
+        self.dest_dir_path = dest_dir_path
+        self.manifest = manifest
+        self.site_index = site_index
+        self.search_index = search_index
+        self.compressor = compressor
+        self.failures = 0
+        
+        
+    def read_failed(self, src_path, error):
+        print(f"An error occurred while reading {src_path}: {str(error)}")
+        self.failures += 1
+        
+        
+    def needs_render(self, src_path, dest_path, metadata, src_hash):
+        #handling drafts and up to date pages, returning True when the page has to be rendered
+        if metadata.get("draft") is True:
+            print(f"Skipping draft {src_path}")
+            if self.manifest is not None:
+                self.manifest.drop(src_path)
+            return False
+        
+        if self.site_index is not None:
+            self.site_index.add(src_path, dest_path, metadata)
+        
+        if (self.manifest is not None and self.manifest.is_up_to_date(src_path, src_hash, dest_path)
+                and (self.search_index is None or self.search_index.has(src_path))):
+            title = self.manifest.previous_title(src_path)
+            self.manifest.record(src_path, src_hash, dest_path, title)
+            if self.site_index is not None:
+                self.site_index.publish(src_path, title)
+            if self.search_index is not None:
+                self.search_index.keep(src_path)
+            if self.compressor is not None:
+                self.compressor.submit(dest_path)
+            return False
+        
+        return True
+    
+    
+    def rendered(self, src_path, dest_path, src_hash, error, title, search_terms):
+        #recording the result of a rendered page, returning False when it failed
+        if error is not None:
+            print(f"An error occurred while generating {src_path}: {error}")
+            self.failures += 1
+            #the previous output of a broken page is left in place, and so are its postings
+            if self.search_index is not None:
+                self.search_index.keep(src_path)
+            return False
         
-   
\ No newline at end of file
+        if self.manifest is not None:
+            self.manifest.record(src_path, src_hash, dest_path, title)
+        if self.site_index is not None:
+            self.site_index.publish(src_path, title)
+        if self.search_index is not None:
+            self.search_index.update(src_path, page_url(dest_path, self.dest_dir_path), title, search_terms)
+        if self.compressor is not None:
+            self.compressor.submit(dest_path)
+        return True
+
+
+def render_pages(chunk):
+    #rendering a chunk of (job, source hash) pairs in a worker process, returning the result of every page
+    return [render_page(job) for job, _ in chunk]
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bounded_map(pool, func, items, max_pending):
+    #like pool.map, but pulling items lazily, with at most max_pending items submitted and not yet consumed
+    #yields (item, result) pairs in the order of the items
+    pending = deque()
+    for item in items:
+        pending.append((item, pool.submit(func, item)))
+        if len(pending) >= max_pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, manifest=None, jobs=1, disk_cache=None, site_index=None, search_index=None, compressor=None, output=None):
+    #when a build manifest is given, pages whose source, template and generator version did not change are skipped
+    #when jobs is greater than 1, pages are rendered by a pool of worker processes
+    #when a disk cache is given, documents rendered by a previous build are not parsed again, the uses of its entries are
+    #recorded by this process (worker processes only read the cache) and written when the cache is evicted or closed
+    #every source file is read once here, its front matter fills the site index, and drafts are skipped before being parsed
+    #pages are published to the site index listeners as soon as their title is known, up to date pages during discovery
+    #when a search index is given, the text of every rendered page is tokenized and its postings are updated
+    #when a compressor is given, every page is handed to it by this process once written, including up to date pages
+    #pages are written to output, the filesystem by default, an in-memory output is always rendered by this process
+    #discovery streams pages to the renderers as it finds them, so rendering starts at once and no list of every page is built
+    #returns the number of pages that failed to generate
+    #the template is loaded and compiled once for the whole build
+    template = Template.load(template_path)
+    templates = {}
+    recorder = PageRecorder(dest_dir_path, manifest, site_index, search_index, compressor)
+    
+    def discover_jobs():
+        #yielding a (job, source hash) pair for every page to render, in a stable order
+        for src_path, dest_path in find_pages(dir_path_content, dest_dir_path, output):
+            try:
+                metadata, body, page_template, src_hash = read_page(src_path, templates)
+            except Exception as e:
+                recorder.read_failed(src_path, e)
+                continue
+            
+            if recorder.needs_render(src_path, dest_path, metadata, src_hash):
+                job = (src_path, page_template or template, dest_path, disk_cache, body, metadata.get("title"), search_index is not None, output)
+                yield job, src_hash
+    
+    try:
+        if jobs > 1 and not (output is not None and output.process_local):
+            #pages are sent in chunks, to keep the inter-process overhead low on big content trees
+            #at most 4 chunks per worker are queued, discovery waits for the workers past that (backpressure)
+            #workers record their own spans when tracing is enabled, and send them back with every result
+            initializer = tracing.start_worker if tracing.enabled else None
+            with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as pool:
+                chunks = iter_chunks(discover_jobs(), PAGE_CHUNK_SIZE)
+                for chunk, results in bounded_map(pool, render_pages, chunks, jobs * 4):
+                    #results come back in discovery order, so errors are reported and recorded deterministically
+                    for (job, src_hash), (error, title, search_terms, trace_events) in zip(chunk, results):
+                        tracing.add_events(trace_events)
+                        recorder.rendered(job[0], job[2], src_hash, error, title, search_terms)
+                        if disk_cache is not None:
+                            disk_cache.mark_used(job[4])
+        else:
+            for job, src_hash in discover_jobs():
+                error, title, search_terms, _ = render_page(job)
+                recorder.rendered(job[0], job[2], src_hash, error, title, search_terms)
+                if disk_cache is not None:
+                    disk_cache.mark_used(job[4])
+    except Exception as e:
+        #a missing content directory, a broken worker pool...: the pages that were not generated are unknown,
+        #so the build counts as failed instead of reporting only the failures seen so far
+        print(f"An error occurred, the build is incomplete: {str(e)}")
+        recorder.failures += 1
+            
+    return recorder.failures
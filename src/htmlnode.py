@@ -1,4 +1,7 @@
 class HTMLNode:
+    #slots instead of a per instance __dict__, documents create a lot of nodes
+    __slots__ = ("tag", "value", "children", "props")
+    
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -7,15 +10,23 @@ class HTMLNode:
         
         
     def to_html(self):
+        return ''.join(self.iter_html())
+    
+    
+    def iter_html(self):
+        #yielding the html of the node as a sequence of fragments, implemented by every node type
         raise NotImplementedError
     
     
+    def render_to(self, writer):
+        #streaming the html of the node into anything with a write method (a file, an io.StringIO...)
+        for fragment in self.iter_html():
+            writer.write(fragment)
+    
+    
     def props_to_html(self):
-        result = ''
         if not self.props == None:
-            for key in self.props:
-                result = result + f" {key}=\"{self.props[key]}\""
-            return result
+            return ''.join(f" {key}=\"{value}\"" for key, value in self.props.items())
         else:
             return None 
         
@@ -49,6 +60,8 @@ class HTMLNode:
     
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag=None, value=None, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value")
@@ -56,6 +69,10 @@ class LeafNode(HTMLNode):
         self.children = None
         
     
+    def iter_html(self):
+        yield self.to_html()
+        
+        
     def to_html(self):  
         if not self.tag:
             return self.value  
@@ -69,6 +86,8 @@ class LeafNode(HTMLNode):
         
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+    
     def __init__(self, tag=None, children=None, props=None ):
         if children is None:
             raise ValueError("ParentNode must have children")
@@ -76,12 +95,11 @@ class ParentNode(HTMLNode):
         self.value = None
         
         
-    def to_html(self):
+    def html_tags(self):
+        #returning the opening and closing tags of the node, both empty for the "" tag
         if self.tag == None:
             raise ValueError("Object must have a tag")
         
-        
-        
         if self.children == None:
             raise ValueError("Object must have children")
         
@@ -90,13 +108,31 @@ class ParentNode(HTMLNode):
         else:
             props = ''  
             
-        children = ''
-        for child in self.children:
-            children += child.to_html()
-            
-        if self.tag == "":
-            return f"{children}"
-            
-        result = f"<{self.tag}{props}>{children}</{self.tag}>" 
+        if self.tag != "":
+            return f"<{self.tag}{props}>", f"</{self.tag}>"
+        return "", ""
+        
+        
+    def iter_html(self):
+        #each child streams its own fragments, so no subtree html is ever concatenated at the ancestor levels
+        #nested parent nodes are walked with a stack instead of nested generators, so deeply nested blocks (quotes in quotes...)
+        #neither hit the recursion limit nor pass every fragment through one generator per level
+        opening_tag, closing_tag = self.html_tags()
+        if opening_tag:
+            yield opening_tag
+        stack = [(iter(self.children), closing_tag)]
         
-        return result
+        while stack:
+            children, closing_tag = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if closing_tag:
+                    yield closing_tag
+            elif isinstance(child, ParentNode):
+                opening_tag, child_closing_tag = child.html_tags()
+                if opening_tag:
+                    yield opening_tag
+                stack.append((iter(child.children), child_closing_tag))
+            else:
+                yield from child.iter_html()
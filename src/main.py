@@ -1,9 +1,163 @@
-from helpers import copy_contents, generate_pages_recursive
+import argparse
+import asyncio
+import os
+from helpers import copy_contents, sync_contents, generate_pages_recursive
+from manifest import BuildManifest, hash_file
+from disk_cache import DiskCache
+from site_index import SiteIndex
+from feeds import FeedWriter
+from search_index import SearchIndex
+from compress import Compressor, parse_formats, remove_compressed
+from output import MemoryOutput
+from async_build import generate_pages_async
+from changes import write_changes
+import tracing
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Generate a static website from the markdown files in ./content")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="number of worker processes used to render pages (0 uses every CPU core)")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete ./public and rebuild everything from scratch")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="compare static assets by content hash instead of modification time")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="hard link static assets into ./public instead of copying them")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not use the on-disk render cache in ./.cache")
+    parser.add_argument("--cache-size-mb", type=int, default=256,
+                        help="size limit of the on-disk render cache, least recently used documents are evicted first")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="delete the on-disk render cache and exit")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record a timeline of the build and write it to FILE as a Chrome/Perfetto trace")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="absolute url of the deployed site, enables sitemap.xml and atom.xml generation")
+    parser.add_argument("--feed-title", default="Recent pages",
+                        help="title of the Atom feed")
+    parser.add_argument("--feed-author", metavar="NAME",
+                        help="author of the Atom feed, the feed title by default")
+    parser.add_argument("--search", action="store_true",
+                        help="write a client-side search index, sharded by term prefix, to ./public/search")
+    parser.add_argument("--compress", metavar="FORMATS", type=parse_formats, default=[],
+                        help="write precompressed siblings of pages and text assets, a comma separated list of gz, xz and bz2")
+    parser.add_argument("--compress-level", type=int,
+                        help="compression level (defaults to 9 for gz and bz2, 6 for xz)")
+    parser.add_argument("--async-io", action="store_true",
+                        help="read sources and write pages in a pool of I/O threads while other pages render, for slow or network filesystems")
+    parser.add_argument("--max-in-flight", type=int, default=32,
+                        help="with --async-io, maximum number of pages between their read and their write")
+    parser.add_argument("--io-threads", type=int, default=8,
+                        help="with --async-io, number of threads reading and writing files")
+    parser.add_argument("--changes-file", metavar="FILE",
+                        help="write the output files added, modified and deleted since the previous build with this option to FILE, as JSON")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="render the whole site in memory without writing anything to disk, to check that it builds")
+    return parser
+
+
+def build(args):
+    #running a full (incremental) build, returning the number of pages that failed to generate
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    
+    if args.trace:
+        tracing.enable()
+    
+    with tracing.span("build"):
+        if args.clean:
+            with tracing.span("copy static"):
+                copy_contents("./static", "./public")
+        
+        manifest = BuildManifest("./.cache/manifest.json", hash_file("./template.html"))
+        #files are compressed by a pool of threads as soon as they are written, while the build goes on
+        compressor = None
+        if args.compress:
+            compressor = Compressor(args.compress, args.compress_level, jobs)
+        with tracing.span("sync static"):
+            sync_contents("./static", "./public", manifest, args.hash_assets, args.link_assets, compressor)
+        disk_cache = None
+        if not args.no_cache:
+            disk_cache = DiskCache("./.cache/render_cache.sqlite", args.cache_size_mb * 1024 * 1024)
+        #the sitemap and the feed are written while the pages are walked, instead of being built in memory at the end
+        feed_writer = None
+        if args.base_url:
+            os.makedirs("public", exist_ok=True)
+            feed_writer = FeedWriter("public", args.base_url, args.feed_title, args.feed_author)
+        site_index = SiteIndex("public", [feed_writer] if feed_writer is not None else [])
+        search_index = None
+        if args.search:
+            search_index = SearchIndex("./.cache/search_index.json", "public/search")
+        with tracing.span("generate pages"):
+            if args.async_io:
+                failures = asyncio.run(generate_pages_async("content", "./template.html", "public", manifest, jobs, disk_cache, site_index, search_index, compressor,
+                                                            max_in_flight=args.max_in_flight, io_threads=args.io_threads))
+            else:
+                failures = generate_pages_recursive("content", "./template.html", "public", manifest, jobs, disk_cache, site_index, search_index, compressor)
+        written = []
+        if feed_writer is not None:
+            written += feed_writer.close()
+        if search_index is not None:
+            with tracing.span("write search index"):
+                search_index.remove_unseen()
+                shards = [search_index.shard_path(shard) for shard in search_index.save()]
+            for file_name in ("pages.json", "search.js"):
+                written.append(os.path.join(search_index.output_dir, file_name))
+            written += [path for path in shards if os.path.exists(path)]
+            for path in shards:
+                if not os.path.exists(path):
+                    remove_compressed(path)
+        for path in manifest.remove_stale():
+            remove_compressed(path)
+        manifest.save()
+        if compressor is not None:
+            for path in written:
+                compressor.submit(path)
+            with tracing.span("compress"):
+                print(f"Compressed {compressor.close()} file(s)")
+        #listed once every file of the build is written, including feeds, search index and compressed siblings
+        if args.changes_file:
+            with tracing.span("list changes"):
+                changes = write_changes(args.changes_file, "public", "./.cache/output_state.json")
+            print(f"Output changes: {len(changes['added'])} added, {len(changes['modified'])} modified, {len(changes['deleted'])} deleted")
+        if disk_cache is not None:
+            disk_cache.evict()
+            disk_cache.close()
+    
+    if args.trace:
+        tracing.write_trace(args.trace)
+    
+    return failures
+
+
+def build_in_memory():
+    #rendering the whole site into a MemoryOutput, always from scratch, and without the manifest and the render cache which live on disk
+    #returns (output, number of pages that failed to generate)
+    output = MemoryOutput()
+    copy_contents("./static", "./public", output)
+    failures = generate_pages_recursive("content", "./template.html", "public", site_index=SiteIndex("public"), output=output)
+    return output, failures
 
     
 def main():
-    copy_contents("./static", "./public")
+    parser = make_parser()
+    args = parser.parse_args()
+    if args.clear_cache:
+        DiskCache("./.cache/render_cache.sqlite").clear()
+        print("Cleared the render cache")
+        return
+    
+    if args.in_memory:
+        if args.base_url or args.search or args.compress:
+            parser.error("--in-memory cannot be combined with --base-url, --search or --compress")
+        output, failures = build_in_memory()
+        print(f"Rendered {len(output.files)} file(s), {output.total_size()} bytes, in memory")
+    else:
+        failures = build(args)
     
-    generate_pages_recursive("content", "template.html", "public")    
+    if failures:
+        raise SystemExit(f"{failures} page(s) failed to generate")
     
-main()
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+
+#bump this whenever a change in the generator alters the generated html, so every page is rebuilt on the next run
+GENERATOR_VERSION = "1"
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    #hashing a file in chunks, so big files are never fully loaded in memory
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    #persistent record of the inputs used for every generated page, used to skip pages whose inputs did not change
+    def __init__(self, path, template_hash):
+        self.path = path
+        self.template_hash = template_hash
+        self.previous_pages = {}
+        self.pages = {}
+        self.previous_assets = {}
+        self.assets = {}
+        #pages that still have a source but must not have an output anymore (e.g. drafts)
+        self.dropped = set()
+        #previous entries can only be reused if they were built by the same generator version, with the same template
+        self.reusable = False
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as file:
+                    data = json.load(file)
+                self.previous_pages = data.get("pages", {})
+                self.previous_assets = data.get("assets", {})
+                self.reusable = (data.get("version") == GENERATOR_VERSION and
+                                 data.get("template") == template_hash)
+            except (ValueError, OSError) as e:
+                print(f"Ignoring unreadable build manifest {path}: {str(e)}")
+
+
+    def is_up_to_date(self, src_path, src_hash, dest_path):
+        #a page can be skipped if its source, the template and the generator are unchanged, and its output still exists
+        if not self.reusable:
+            return False
+
+        entry = self.previous_pages.get(src_path)
+        if entry is None:
+            return False
+
+        return (entry["hash"] == src_hash and
+                entry["dest"] == dest_path and
+                os.path.exists(dest_path))
+
+
+    def record(self, src_path, src_hash, dest_path, title=None):
+        self.pages[src_path] = {"hash": src_hash, "dest": dest_path, "title": title}
+
+
+    def previous_title(self, src_path):
+        return self.previous_pages.get(src_path, {}).get("title")
+
+
+    def drop(self, src_path):
+        #the page will not be generated anymore, so its previous output is removed by remove_stale
+        self.dropped.add(src_path)
+
+
+    def record_asset(self, src_path, dest_path):
+        self.assets[src_path] = dest_path
+
+
+    def remove_stale(self):
+        #removing the output of every page and static asset whose source file was deleted since the previous build
+        removed = []
+        for src_path, entry in self.previous_pages.items():
+            if src_path in self.pages:
+                continue
+
+            if os.path.exists(src_path) and src_path not in self.dropped:
+                #the source still exists but was not rebuilt this time (e.g. after an error)
+                #its entry is only kept if it is still valid for the current template and generator
+                if self.reusable:
+                    self.pages[src_path] = entry
+                continue
+
+            if os.path.exists(entry["dest"]):
+                print(f"Removing stale page {entry['dest']}")
+                os.remove(entry["dest"])
+            removed.append(entry["dest"])
+
+        for src_path, dest_path in self.previous_assets.items():
+            if src_path in self.assets:
+                continue
+
+            if os.path.exists(src_path):
+                self.assets[src_path] = dest_path
+                continue
+
+            if os.path.exists(dest_path):
+                print(f"Removing stale asset {dest_path}")
+                os.remove(dest_path)
+            removed.append(dest_path)
+
+        return removed
+
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "version": GENERATOR_VERSION,
+            "template": self.template_hash,
+            "pages": self.pages,
+            "assets": self.assets,
+        }
+        with open(self.path, 'w') as file:
+            json.dump(data, file, indent=1, sort_keys=True)
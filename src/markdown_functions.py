@@ -1,5 +1,6 @@
 from textnode import TextNode, text_node_to_html_node
 from htmlnode import ParentNode
+from block_cache import block_cache
 import re
 import textwrap
 
@@ -37,17 +38,70 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+def find_next(text, token, start, positions):
+    #text.find(token, start), remembering the result in positions, a dict shared by the searches of a single text
+    #a found position answers every later search starting before it, and a failed search every later search, so a text
+    #full of unmatched "[" or "*" is searched once for each token instead of once for each of them (quadratic time)
+    cached = positions.get(token)
+    if cached is not None:
+        searched_from, position = cached
+        if searched_from <= start and (position == -1 or position >= start):
+            return position
+    position = text.find(token, start)
+    positions[token] = (start, position)
+    return position
+
+
+def match_inline_link(text, start, positions=None):
+    #matching the "alt](url)" part of an image or a link, with start pointing right after the opening "["
+    #the first "](" and the first ")" after it, on the same line
+    #positions memoizes the searches across the calls made on the same text, best with non decreasing starts
+    if positions is None:
+        positions = {}
+    separator = find_next(text, "](", start, positions)
+    if separator == -1:
+        return None
+    
+    end = find_next(text, ")", separator + 2, positions)
+    if end == -1:
+        return None
+    
+    #"](" and ")" are not newlines, so the first newline after start is past end when neither part holds one
+    newline = find_next(text, "\n", start, positions)
+    if newline != -1 and newline < end:
+        return None
+    
+    return text[start:separator], text[separator + 2:end], end + 1
+
+
+def iter_markdown_links(text, opener):
+    #yielding (alt, url, start, end) for the images (opener "![") or the links (opener "[") of text, in a single left to right pass
+    #the same matches as the regexes "!\[(.*?)\]\((.*?)\)" and "(?<!!)\[(.*?)\]\((.*?)\)", in linear time
+    positions = {}
+    index = text.find(opener)
+    while index != -1:
+        if opener == "[" and index > 0 and text[index - 1] == "!":
+            index = text.find(opener, index + 1)
+            continue
+        
+        match = match_inline_link(text, index + len(opener), positions)
+        if match:
+            alt, url, end = match
+            yield alt, url, index, end
+            index = text.find(opener, end)
+        else:
+            index = text.find(opener, index + 1)
+
+
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[(.*?)\]\((.*?)\)", text)
-    return matches
+    return [(alt, url) for alt, url, _, _ in iter_markdown_links(text, "![")]
 
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
-    return matches
+    return [(alt, url) for alt, url, _, _ in iter_markdown_links(text, "[")]
 
 
-def split_nodes_generic(old_nodes, extract_func, regex_pattern, text_type):
+def split_nodes_generic(old_nodes, opener, text_type):
     #splitting TextNode objects into TextNode objects of type text and image or link, where appropriate
     new_nodes = []
     for node in old_nodes:
@@ -56,186 +110,184 @@ def split_nodes_generic(old_nodes, extract_func, regex_pattern, text_type):
             new_nodes.append(node)
             continue
         
-        results = re.split(regex_pattern, node.text)
-        #creating a results list that is splitting the initial text node into multiple text nodes based on the given regex pattern
-        extracted_nodes = extract_func(node.text)
-        #creating a list of tuples, each with alt text and link, from the same source
-        
-        index = 0
-        while index < len(results):        
-        #iterating the results list and checking if any of the items is found within the extracted_nodes list
-            special_flag = False
-            #flag initialized with False, it will turn True if an item is found within the extracted_nodes
-            if index + 1 < len(results):
-            #removing unnecessary iterations    
-                for ex_node in extracted_nodes:
-                    #looping over extracted_nodes and checking if the results item is found in any of the extracted_nodes tuples
-                    if results[index] == ex_node[0] and results[index + 1] == ex_node[1]:
-                    #if the tuple matches with the current and next item, a new TextNode is created using the current and next item as alt text and url, and added to new_nodes
-                        special_flag = True
-                        special_text = results[index]
-                        special_url = results[index + 1]
-                        if special_url:
-                            new_nodes.append(TextNode(special_text, text_type, special_url))
-                        index += 1
-                        break
-                        
-            if not special_flag and results[index]:
-            #if flag is still False and the current item is not an empty string, the current item will be added to new_nodes as a text type TextNode
-                new_nodes.append(TextNode(results[index], "text"))
-                    
-            index += 1
+        text_start = 0
+        for alt, url, start, end in iter_markdown_links(node.text, opener):
+            #the text before every match is added as a text type TextNode, then the match itself, matches without url are dropped
+            if text_start < start:
+                new_nodes.append(TextNode(node.text[text_start:start], "text"))
+            if url:
+                new_nodes.append(TextNode(alt, text_type, url))
+            text_start = end
+            
+        if text_start < len(node.text):
+            new_nodes.append(TextNode(node.text[text_start:], "text"))
             
     return new_nodes
-                            
 
 
 def split_nodes_image(old_nodes):    
     #variation for split_nodes for images
-    return split_nodes_generic(old_nodes, extract_markdown_images, r"!\[(.*?)\]\((.*?)\)", "image")
+    return split_nodes_generic(old_nodes, "![", "image")
 
 
 def split_nodes_link(old_nodes):    
     #variation for split_nodes for links
-    return split_nodes_generic(old_nodes, extract_markdown_links, r"(?<!!)\[(.*?)\]\((.*?)\)", "link")
+    return split_nodes_generic(old_nodes, "[", "link")
 
 
-def text_to_textnodes(text):
-    #Converting the given text into a list of TextNode objects by successively applying the split functions
-    node = TextNode(text, "text")
-    
-    node_images = split_nodes_image([node])
-  
-    node_links = split_nodes_link([*node_images])
-    
-    node_bold = split_nodes_delimiter([*node_links], "**", "bold")   
-   
-    node_italic = split_nodes_delimiter([*node_bold], "*", "italic")
-    
-    node_code = split_nodes_delimiter([*node_italic], "`", "code")    
-    
-    return node_code
+#inline delimiters and their text types, in the order they are split: "**" before "*" so bold is never read as two italics
+INLINE_DELIMITERS = {"**": "bold", "*": "italic", "`": "code"}
 
 
-def markdown_to_blocks(markdown):
-    #taking a full markdown document and converting it to a list of "block" strings
-    dedent_mark = textwrap.dedent(markdown)
-    
-    #we need a different approach for code blocks marked by "```", so we identify and return any blocks that start and end with this separator
-    regex = r"^```[\s\S]*?```$"
-    matches = re.findall(regex, markdown, re.MULTILINE)
-    
-    #storing placeholders for each code block
-    placeholder_map = {}
-    placeholder_counter = 0
-    
-    #we create placeholders for our matches and replace every match in the markdown string with a placeholder
-    for match in matches:
-        placeholder = f"CODEBLOCK{placeholder_counter}"
-        dedent_mark = dedent_mark.replace(match, placeholder)
-        placeholder_map[placeholder] = match
-        placeholder_counter += 1
-    
-    #we split our markdown string into block strings, now that we replaced any potential code blocks
-    block_strings = dedent_mark.split("\n\n") 
-    
-    #isolating headings present in other blocks
-    heading_regex = r"^(#{1,6} .+)"
-    new_blocks = []
-    for block in block_strings:
-        parts = re.split(heading_regex, block, flags=re.MULTILINE)
-        for part in parts:
-            if part:
-                new_blocks.append(part.strip())
-    
-    #reinserting code blocks by replacing the placeholders
-    for i, block in enumerate(new_blocks):
-        if block.startswith("CODEBLOCK"):
-            new_blocks[i] = placeholder_map[block]
-    
-    #cleaning the blocks of whitespace
-    clean_blocks = []      
-    for block in new_blocks:
-        lines = block.splitlines()
-        
-        #Defining patterns for ordered and unordered list markers
-        ul_pattern = r"^\s*[*-]\s+"
-        ol_pattern = r"^\s*\d+\.\s+"
+def split_text_delimiters(text, nodes):
+    #appending the nodes of a text holding no image or link to nodes, splitting it on every delimiter in turn
+    text_nodes = [TextNode(text, "text")]
+    for delimiter, text_type in INLINE_DELIMITERS.items():
+        text_nodes = split_nodes_delimiter(text_nodes, delimiter, text_type)
+    nodes.extend(text_nodes)
+
+
+def split_text_links(text, nodes):
+    #appending the nodes of a text holding no image to nodes: its links, and the delimited text between them
+    text_start = 0
+    for anchor, url, start, end in iter_markdown_links(text, "["):
+        split_text_delimiters(text[text_start:start], nodes)
+        #matches without url are dropped
+        if url:
+            nodes.append(TextNode(anchor, "link", url))
+        text_start = end
+    split_text_delimiters(text[text_start:], nodes)
+
+
+def text_to_textnodes(text):
+    #Converting the given text into a list of TextNode objects, with the precedence of the split functions:
+    #images first, then links in the text between images, then "**", "*" and "`" in the text left between them,
+    #so a link inside bold or italic text stays a link, and a "*" inside a url is not a delimiter
+    #every part of the text is scanned a fixed number of times, instead of rebuilding the node list once for each split
+    nodes = []
+    text_start = 0
+    for alt, url, start, end in iter_markdown_links(text, "!["):
+        split_text_links(text[text_start:start], nodes)
+        if url:
+            nodes.append(TextNode(alt, "image", url))
+        text_start = end
+    split_text_links(text[text_start:], nodes)
+    return nodes
+
+
+#a heading line is 1 to 6 "#" followed by a space
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+#heading tags indexed by heading level, shared by every heading node instead of building a new string each time
+HEADING_TAGS = (None, "h1", "h2", "h3", "h4", "h5", "h6")
+#lines starting with a list marker keep their indentation inside a block
+LIST_ITEM_PATTERN = re.compile(r"\s*(?:[*-]|\d+\.)\s+")
+#the "> " markers a line of a nested quote starts with
+QUOTE_MARKERS_PATTERN = re.compile(r"(?:> )*")
+
+
+def classify_block(block, lines):
+    #returning the type of a markdown block (6 types supported), checking every line only once for all the line based types
+    if HEADING_PATTERN.match(block):
+        return "heading"
+    if block.startswith("```") and block.endswith("```"):
+        return "code"
+    
+    quote = True
+    star_list = True
+    dash_list = True
+    ordered_list = True
+    
+    for index, line in enumerate(lines):
+        stripped_line = line.lstrip()
+        if quote and (not stripped_line.startswith(">") or (len(stripped_line) > 1 and stripped_line[1] != " ")):
+            quote = False
+        if star_list and not stripped_line.startswith("* "):
+            star_list = False
+        if dash_list and not stripped_line.startswith("- "):
+            dash_list = False
+        if ordered_list and not stripped_line.startswith(f"{index + 1}. "):
+            ordered_list = False
+            
+        if not (quote or star_list or dash_list or ordered_list):
+            return "paragraph"
+    
+    if quote:
+        return "quote"
+    if star_list or dash_list:
+        return "unordered_list"
+    if ordered_list:
+        return "ordered_list"
+    return "paragraph"
+
+
+def scan_block_lines(lines, fences=True):
+    #grouping lines into blocks and classifying them as they are completed, yielding (block_type, block) tuples
+    block_lines = []
+    code_lines = None
+    
+    def flush():
+        #the first line of a block is fully stripped, the other lines are stripped unless they start with a list marker
+        block_lines[-1] = block_lines[-1].rstrip()
+        block = "\n".join(block_lines)
+        block_type = "code" if code_lines is not None else classify_block(block, block_lines)
+        block_lines.clear()
+        return block_type, block
+    
+    for line in lines:
+        if code_lines is not None:
+            #inside a fenced code block, blank lines and headings do not end the block
+            code_lines.append(line)
+            block_lines.append(line if LIST_ITEM_PATTERN.match(line) else line.strip())
+            if line.rstrip().endswith("```"):
+                yield flush()
+                code_lines = None
+            continue
         
-        stripped_lines = []
+        stripped_line = line.strip()
         
-        for index, line in enumerate(lines):
-            #Strip first line regardless of pattern
-            if index == 0:
-                stripped_line = line.strip()
-            else:
-                #General stripping rule for lines that are not starting with list markers
-                if not re.match(ul_pattern, line) and not re.match(ol_pattern, line):
-                    stripped_line = line.strip()
-                else:
-                    stripped_line = line
-                
-            stripped_lines.append(stripped_line)
+        if fences and line.startswith("```"):
+            if block_lines:
+                yield flush()
+            code_lines = [line]
+            block_lines.append(stripped_line)
+            #a fence can be opened and closed on the same line
+            if len(stripped_line) >= 6 and stripped_line.endswith("```"):
+                yield flush()
+                code_lines = None
+        elif not stripped_line:
+            if block_lines:
+                yield flush()
+        elif HEADING_PATTERN.match(line) and len(stripped_line) > len(HEADING_PATTERN.match(line).group()):
+            #headings are always blocks of their own
+            if block_lines:
+                yield flush()
+            yield "heading", stripped_line
+        elif not block_lines:
+            block_lines.append(stripped_line)
+        else:
+            block_lines.append(line if LIST_ITEM_PATTERN.match(line) else stripped_line)
             
-        clean_blocks.append('\n'.join(stripped_lines).strip())            
-        
-    #adding back only the non empty blocks
-    clean_blocks = [block for block in clean_blocks if block]
-    
-    return clean_blocks     
+    if code_lines is not None:
+        #an unclosed fence is not a code block, its lines are scanned again as regular markdown
+        block_lines.clear()
+        yield from scan_block_lines(code_lines, fences=False)
+    elif block_lines:
+        yield flush()
+
+
+def scan_blocks(markdown):
+    #splitting a full markdown document into typed blocks, in a single pass over its lines
+    return scan_block_lines(textwrap.dedent(markdown).splitlines())
+
+
+def markdown_to_blocks(markdown):
+    #taking a full markdown document and converting it to a list of "block" strings
+    return [block for _, block in scan_blocks(markdown)]
 
 
 def block_to_block_type(block):
     #function that returns the type of markdown block (6 types supported), based on the starting characters
-    lines = block.splitlines()
-    #list of lines to be used when checking for lists or quotes
-    
-    def heading():
-        start_string = block[0:7]
-        return bool(re.match(r"^#{1,6} ", start_string))
-            
-        
-    def quote():
-        quote_flag = True
-        for line in lines:
-            stripped_line = line.lstrip()
-            if not stripped_line.startswith(">") or (len(stripped_line) > 1 and stripped_line[0] == ">" and stripped_line[1] != " "):
-                quote_flag = False
-                
-        return quote_flag
-  
-    
-    def unordered_list(char):
-        ul_flag = True
-        for line in lines:
-            if not line.lstrip().startswith(char):
-                ul_flag = False
-                
-        return ul_flag
-    
-    
-    def ordered_list():
-        ol_flag = True
-        for i in range(0, len(lines)):
-            if not lines[i].lstrip().startswith(f"{i + 1}. "):
-                ol_flag = False
-                
-        return ol_flag
-    
-    if heading():
-        block_type = "heading"
-    elif block.startswith("```") and block.endswith("```"):
-        block_type = "code"
-    elif quote():
-        block_type = "quote"
-    elif unordered_list("* ") or unordered_list("- "):
-        block_type = "unordered_list"
-    elif ordered_list():
-        block_type = "ordered_list"
-    else:
-        block_type = "paragraph"
-    
-    return block_type
+    return classify_block(block, block.splitlines())
 
 
 def text_to_children(text): 
@@ -251,7 +303,7 @@ def process_heading(block):
     heading_level = heading_match.count("#")
     text_content = block[len(heading_match):]                
     children = text_to_children(text_content)   
-    heading_node = ParentNode(f"h{heading_level}", children, [])
+    heading_node = ParentNode(HEADING_TAGS[heading_level], children)
     
     return heading_node
 
@@ -260,8 +312,8 @@ def process_code(block):
     code_match = "```"
     text_content = block[len(code_match):-len(code_match)]
     children = text_to_children(text_content)
-    code_node = ParentNode("code", children, [])
-    pre_node = ParentNode("pre", [code_node], [])
+    code_node = ParentNode("code", children)
+    pre_node = ParentNode("pre", [code_node])
     
     return pre_node
 
@@ -272,8 +324,8 @@ def process_unordered_list(block):
     ul_pattern = r"^\s*[*-]\s+"
     
     text_lines = [re.sub(ul_pattern, '', line) for line in block_lines]    
-    li_nodes = [ParentNode("li", text_to_children(line), []) for line in text_lines]
-    ul_node = ParentNode("ul", li_nodes, [])   
+    li_nodes = [ParentNode("li", text_to_children(line)) for line in text_lines]
+    ul_node = ParentNode("ul", li_nodes)   
     
     return ul_node
 
@@ -284,8 +336,8 @@ def process_ordered_list(block):
     ol_pattern = r"^\s*\d+\.\s+"
     
     text_lines = [re.sub(ol_pattern, '', line) for line in block_lines]
-    li_nodes = [ParentNode("li", text_to_children(line), []) for line in text_lines]
-    ol_node = ParentNode("ol", li_nodes, [])
+    li_nodes = [ParentNode("li", text_to_children(line)) for line in text_lines]
+    ol_node = ParentNode("ol", li_nodes)
     
     return ol_node               
     
@@ -293,72 +345,95 @@ def process_ordered_list(block):
 def process_quote(block):
     quote_match = "> "
     block_lines = block.splitlines()
+    
+    #when every line of a multi line quote starts with two "> " or more, the quote only holds another quote block, which would be
+    #scanned again at every level (quadratic time in the nesting depth), the levels shared by every line are unwrapped at once instead
+    nesting = 0
+    if len(block_lines) > 1:
+        stripped_lines = [line.rstrip() for line in block_lines]
+        nesting = min(QUOTE_MARKERS_PATTERN.match(line).end() for line in stripped_lines) // len(quote_match) - 1
+        if nesting > 0:
+            block_lines = [line[nesting * len(quote_match):] for line in stripped_lines]
+            
     text_lines = [line[len(quote_match):] for line in block_lines]
     text_content = "\n".join(text_lines)
     
     if (len(text_lines) > 1):    
         sub_quote_node = markdown_to_html_node(text_content, wrap_in_div=False)  
-        quote_node = ParentNode("blockquote", [sub_quote_node], [])
+        quote_node = ParentNode("blockquote", [sub_quote_node])
     else:
         children = text_to_children(text_content)  
-        quote_node = ParentNode("blockquote", children, [])  
+        quote_node = ParentNode("blockquote", children)  
+    
+    for _ in range(nesting):
+        quote_node = ParentNode("blockquote", [ParentNode("", [quote_node])])
     
     return quote_node
 
 
 def process_paragraph(block):
     children = text_to_children(block)
-    p_node = ParentNode("p", children, [])  
+    p_node = ParentNode("p", children)  
     return p_node
 
 
-def markdown_to_html_node(markdown, wrap_in_div=True):
-    markdown_blocks = markdown_to_blocks(markdown)
+def block_to_html_node(block_type, block):
+    match block_type:
+        case "heading":
+            return process_heading(block)
+                            
+        case "quote":
+            return process_quote(block)                
+            
+        case "code":
+            return process_code(block)
+            
+        case "ordered_list":
+            return process_ordered_list(block)            
+            
+        case "unordered_list":               
+            return process_unordered_list(block)
+            
+        case "paragraph":
+            return process_paragraph(block) 
+
+
+def blocks_to_html_node(blocks, wrap_in_div=True):
+    #converting (block_type, block) tuples into a single node holding every block node
     block_nodes = []
     
-    for block in markdown_blocks:
-        block_type = block_to_block_type(block)
-       
-        match block_type:
-            case "heading":
-                heading_node = process_heading(block)
-                block_nodes.append(heading_node)
-                                
-            case "quote":
-                quote_node = process_quote(block)                
-                block_nodes.append(quote_node)
-                
-            case "code":
-                pre_node = process_code(block)
-                block_nodes.append(pre_node)
-                
-            case "ordered_list":
-                ol_node = process_ordered_list(block)            
-                block_nodes.append(ol_node)
-                
-            case "unordered_list":               
-                ul_node = process_unordered_list(block)
-                block_nodes.append(ul_node)
-                
-            case "paragraph":
-                p_node = process_paragraph(block) 
-                block_nodes.append(p_node)
+    for block_type, block in blocks:
+        #identical blocks across pages (footers, disclaimers, shared samples...) are only parsed and rendered once
+        block_node = block_cache.get(block)
+        if block_node is None:
+            block_node = block_cache.put(block, block_to_html_node(block_type, block))
+        block_nodes.append(block_node)
                                 
     if wrap_in_div:
-        result_node = ParentNode("div", block_nodes, [])   
+        result_node = ParentNode("div", block_nodes)   
     else:
-        result_node = ParentNode("", block_nodes, [])             
+        result_node = ParentNode("", block_nodes)             
     
     return result_node
 
 
+def markdown_to_html_node(markdown, wrap_in_div=True):
+    return blocks_to_html_node(scan_blocks(markdown), wrap_in_div)
+
+
+def heading_title(block):
+    #returning the text of a h1 heading block, or None for lower level headings
+    if re.match(r"^#\s", block):
+        return block.strip("#").strip()
+    return None
+
+
 def extract_title(markdown):
-    markdown_blocks = markdown_to_blocks(markdown)
-    for block in markdown_blocks:
-        block_type = block_to_block_type(block)
+    for block_type, block in scan_blocks(markdown):
         if block_type == "heading":
-            if re.match(r"^#\s", block):
-                return block.strip("#").strip()
+            title = heading_title(block)
+            if title is not None:
+                return title
             
     raise Exception("No header was found")    
 
@@ -0,0 +1,319 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from manifest import hash_bytes, hash_file
+
+#temporary files are named .<name>.<random>.tmp, next to the file they replace
+TEMP_PREFIX = "."
+TEMP_SUFFIX = ".tmp"
+
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def current_umask():
+    #read once, on first use: os.umask can only be read by setting it, which changes it for every thread of the process
+    #Linux shows it in /proc, so it is only set (briefly, under the lock) on other platforms
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", 'r') as file:
+                    for line in file:
+                        if line.startswith("Umask:"):
+                            _umask = int(line.split()[1], 8)
+                            break
+            except OSError:
+                pass
+            if _umask is None:
+                _umask = os.umask(0o022)
+                os.umask(_umask)
+        return _umask
+
+
+def is_temp_name(name):
+    #True for the temporary files of temp_path_for, which a crashed build can leave behind
+    return name.startswith(TEMP_PREFIX) and name.endswith(TEMP_SUFFIX)
+
+
+def temp_path_for(path):
+    #creating an empty temporary file next to path (so it can be renamed over path), returning its path
+    #it gets the permissions a regular open() would give it, instead of the 0600 of mkstemp
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{TEMP_PREFIX}{name}.", suffix=TEMP_SUFFIX)
+    os.close(fd)
+    try:
+        os.chmod(temp_path, 0o666 & ~current_umask())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def remove_temp(temp_path):
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+
+
+def same_content(path, other_path):
+    #comparing sizes first, then content hashes
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == hash_file(other_path)
+
+
+class AtomicFile:
+    #file object writing to a temporary file, which replaces path when it is closed, so readers never see a half-written file
+    #when the new content is identical to the existing file, the existing file is kept as is, with its modification time
+    def __init__(self, path, mode='w'):
+        self.path = path
+        self.temp_path = temp_path_for(path)
+        try:
+            self.file = open(self.temp_path, mode)
+        except BaseException:
+            remove_temp(self.temp_path)
+            raise
+        #True once the file was replaced, False when the existing file was identical
+        self.changed = None
+
+
+    def write(self, data):
+        return self.file.write(data)
+
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.file.close()
+            if same_content(self.temp_path, self.path):
+                self.changed = False
+            else:
+                os.replace(self.temp_path, self.path)
+                self.changed = True
+        finally:
+            #already renamed when the file was replaced, removed when it was identical or something failed
+            remove_temp(self.temp_path)
+
+
+    def discard(self):
+        #dropping what was written, the existing file is left untouched
+        try:
+            self.file.close()
+        finally:
+            remove_temp(self.temp_path)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def atomic_open(path, mode='w'):
+    return AtomicFile(path, mode)
+
+
+def copy_file(from_path, dest_path, link=False):
+    #replacing dest_path with a copy of from_path, using a hard link or an in-kernel copy where the filesystem allows it
+    #the copy is made next to the destination and renamed over it, so the destination is never missing or half-written
+    #and we never write through an existing hard link into the source tree
+    temp_path = temp_path_for(dest_path)
+    try:
+        copy_to(from_path, temp_path, link)
+        os.replace(temp_path, dest_path)
+    finally:
+        remove_temp(temp_path)
+
+
+def copy_to(from_path, dest_path, link):
+    #filling dest_path, a fresh temporary file, with the content of from_path
+    if link:
+        try:
+            os.remove(dest_path)
+            os.link(from_path, dest_path)
+            return
+        except OSError:
+            #different filesystems, or links not supported, falling back to a regular copy
+            pass
+
+    try:
+        with open(from_path, 'rb') as src_file, open(dest_path, 'wb') as dest_file:
+            remaining = os.fstat(src_file.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src_file.fileno(), dest_file.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        #copy_file_range is not available on this platform or filesystem
+        shutil.copyfile(from_path, dest_path)
+
+    #keeping the source modification time, so the next sync can tell the copy is up to date
+    shutil.copystat(from_path, dest_path)
+
+
+class DiskOutput:
+    #writing the build output to the filesystem
+    #process_local is False: worker processes can write their pages themselves
+    process_local = False
+
+    def open(self, path, mode='w'):
+        #files are written atomically, and identical content does not touch the existing file
+        if "r" in mode:
+            return open(path, mode)
+        return atomic_open(path, mode)
+
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+
+    def stat(self, path):
+        return os.stat(path)
+
+
+    def hash_file(self, path):
+        return hash_file(path)
+
+
+    def remove(self, path):
+        os.remove(path)
+
+
+    def rmtree(self, path):
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+
+    def copy_file(self, from_path, dest_path, link=False):
+        copy_file(from_path, dest_path, link)
+
+
+    def copystat(self, from_path, dest_path):
+        shutil.copystat(from_path, dest_path)
+
+
+class MemoryFile:
+    #file object of a MemoryOutput, its content is stored in the output when it is closed
+    def __init__(self, output, path, buffer):
+        self.output = output
+        self.path = path
+        self.buffer = buffer
+
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+    def close(self):
+        if not self.buffer.closed:
+            value = self.buffer.getvalue()
+            self.output.store(self.path, value.encode() if isinstance(value, str) else value, time.time_ns())
+            self.buffer.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemoryOutput:
+    #keeping the build output in a dict of normalized path -> bytes, without touching the disk
+    #process_local is True: pages are rendered in the building process, worker processes could not write into this dict
+    process_local = True
+
+    def __init__(self):
+        self.files = {}
+        self.mtimes = {}
+        self.directories = set()
+
+
+    def store(self, path, data, mtime_ns):
+        #like the disk, identical content keeps its modification time
+        path = os.path.normpath(path)
+        if self.files.get(path) == data:
+            return
+        self.files[path] = data
+        self.mtimes[path] = mtime_ns
+
+
+    def read(self, path):
+        return self.files[os.path.normpath(path)]
+
+
+    def open(self, path, mode='w'):
+        if "r" in mode:
+            data = self.read(path)
+            return io.BytesIO(data) if "b" in mode else io.StringIO(data.decode())
+        return MemoryFile(self, path, io.BytesIO() if "b" in mode else io.StringIO())
+
+
+    def makedirs(self, path):
+        self.directories.add(os.path.normpath(path))
+
+
+    def exists(self, path):
+        path = os.path.normpath(path)
+        return path in self.files or path in self.directories
+
+
+    def stat(self, path):
+        path = os.path.normpath(path)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return SimpleNamespace(st_size=len(self.files[path]), st_mtime_ns=self.mtimes[path])
+
+
+    def hash_file(self, path):
+        return hash_bytes(self.read(path))
+
+
+    def remove(self, path):
+        path = os.path.normpath(path)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        del self.files[path]
+        del self.mtimes[path]
+
+
+    def rmtree(self, path):
+        prefix = os.path.normpath(path) + os.sep
+        for file_path in [file_path for file_path in self.files if file_path.startswith(prefix)]:
+            self.remove(file_path)
+        self.directories = {directory for directory in self.directories if not directory.startswith(prefix)}
+        self.directories.discard(os.path.normpath(path))
+
+
+    def copy_file(self, from_path, dest_path, link=False):
+        #links make no sense in memory, the source is always read
+        with open(from_path, 'rb') as file:
+            data = file.read()
+        self.store(dest_path, data, os.stat(from_path).st_mtime_ns)
+
+
+    def copystat(self, from_path, dest_path):
+        self.mtimes[os.path.normpath(dest_path)] = os.stat(from_path).st_mtime_ns
+
+
+    def total_size(self):
+        return sum(len(data) for data in self.files.values())
@@ -0,0 +1,204 @@
+import json
+import os
+import re
+from manifest import GENERATOR_VERSION
+from output import atomic_open
+
+#terms are lowercased runs of word characters (Unicode letters and digits, and "_"), single characters are not indexed
+#the search script splits queries with the same classes, spelled \p{L}\p{N}_ as JavaScript's \w is ASCII only
+TOKEN_PATTERN = re.compile(r"\w\w+")
+#shards are named by the first characters of their terms, so a query only fetches the shards of its own terms
+PREFIX_LENGTH = 2
+
+#minimal client: search("ring lord") resolves to the pages holding every term of the query, best matches first
+SEARCH_SCRIPT = """\
+const searchRoot = new URL(".", document.currentScript.src);
+const searchShards = {};
+let searchPages = null;
+
+function searchShardName(term, prefixLength) {
+  const prefix = term.slice(0, prefixLength);
+  return /^[a-z0-9]+$/.test(prefix) ? prefix : "_";
+}
+
+function searchTerms(query) {
+  return query.toLowerCase().match(/[\\p{L}\\p{N}_]{2,}/gu) || [];
+}
+
+async function searchFetch(name) {
+  const response = await fetch(new URL(name + ".json", searchRoot));
+  return response.ok ? response.json() : {};
+}
+
+async function search(query) {
+  searchPages = searchPages || await searchFetch("pages");
+  const terms = searchTerms(query);
+  let scores = null;
+  for (const term of terms) {
+    const shard = searchShardName(term, searchPages.prefix_length);
+    searchShards[shard] = searchShards[shard] || searchFetch(shard);
+    const postings = (await searchShards[shard])[term] || [];
+    const termScores = new Map(postings);
+    if (scores === null) {
+      scores = termScores;
+    } else {
+      scores = new Map([...scores].filter(([page]) => termScores.has(page)).map(([page, count]) => [page, count + termScores.get(page)]));
+    }
+  }
+  return [...(scores || [])].sort((a, b) => b[1] - a[1]).map(([page]) => searchPages.pages[page]);
+}
+"""
+
+
+def iter_text(node):
+    #text values of an HTMLNode tree, in document order
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+        elif node.value:
+            yield node.value
+
+
+def tokenize(node):
+    #mapping every term of a page to the number of times it appears
+    terms = {}
+    for text in iter_text(node):
+        for term in TOKEN_PATTERN.findall(text.lower()):
+            terms[term] = terms.get(term, 0) + 1
+    return terms
+
+
+def shard_name(term, prefix_length=PREFIX_LENGTH):
+    prefix = term[:prefix_length]
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "_"
+
+
+class SearchIndex:
+    #inverted index of the site, written to output_dir as pages.json (page id -> url and title) and one json file per term prefix
+    #the terms of every page are kept in the state file, so an incremental build only rewrites the shards of the pages that changed
+    def __init__(self, state_path, output_dir, prefix_length=PREFIX_LENGTH):
+        self.state_path = state_path
+        self.output_dir = output_dir
+        self.prefix_length = prefix_length
+        self.pages = {}
+        self.next_id = 0
+        self.seen = set()
+        self.dirty_ids = set()
+        self.dirty_shards = set()
+        self.reset = True
+
+        state = None
+        if os.path.exists(state_path) and os.path.exists(os.path.join(output_dir, "pages.json")):
+            try:
+                with open(state_path, 'r') as file:
+                    state = json.load(file)
+            except (OSError, ValueError):
+                state = None
+
+        #the state is only reused when it describes the shards that are actually in output_dir
+        if state is not None and state.get("version") == GENERATOR_VERSION and state.get("prefix_length") == prefix_length:
+            self.pages = state["pages"]
+            self.next_id = state["next_id"]
+            self.reset = False
+
+
+    def has(self, src_path):
+        return src_path in self.pages
+
+
+    def keep(self, src_path):
+        #marking a page that did not change, its postings stay as they are
+        self.seen.add(src_path)
+
+
+    def update(self, src_path, url, title, terms):
+        self.seen.add(src_path)
+        previous = self.pages.get(src_path)
+        if previous is not None:
+            if previous["url"] == url and previous["title"] == title and previous["terms"] == terms:
+                return
+            page_id = previous["id"]
+            self.dirty_shards.update(shard_name(term, self.prefix_length) for term in previous["terms"])
+        else:
+            page_id = self.next_id
+            self.next_id += 1
+
+        self.pages[src_path] = {"id": page_id, "url": url, "title": title, "terms": terms}
+        self.dirty_ids.add(page_id)
+        self.dirty_shards.update(shard_name(term, self.prefix_length) for term in terms)
+
+
+    def remove(self, src_path):
+        page = self.pages.pop(src_path, None)
+        if page is not None:
+            self.dirty_ids.add(page["id"])
+            self.dirty_shards.update(shard_name(term, self.prefix_length) for term in page["terms"])
+
+
+    def remove_unseen(self):
+        #removing the pages that were deleted (or became drafts) since the previous build
+        for src_path in [src_path for src_path in self.pages if src_path not in self.seen]:
+            self.remove(src_path)
+
+
+    def shard_path(self, shard):
+        return os.path.join(self.output_dir, f"{shard}.json")
+
+
+    def load_shard(self, shard):
+        if self.reset or not os.path.exists(self.shard_path(shard)):
+            return {}
+        with open(self.shard_path(shard), 'r') as file:
+            return json.load(file)
+
+
+    def save(self):
+        #rewriting the shards holding a term of a changed or removed page, returning the names of the rewritten shards
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.reset:
+            for file_name in os.listdir(self.output_dir):
+                if file_name.endswith(".json"):
+                    os.remove(os.path.join(self.output_dir, file_name))
+
+        additions = {}
+        for page in self.pages.values():
+            if page["id"] in self.dirty_ids:
+                for term, count in page["terms"].items():
+                    additions.setdefault(shard_name(term, self.prefix_length), {}).setdefault(term, []).append([page["id"], count])
+
+        for shard in self.dirty_shards:
+            postings = {}
+            for term, term_postings in self.load_shard(shard).items():
+                kept = [posting for posting in term_postings if posting[0] not in self.dirty_ids]
+                if kept:
+                    postings[term] = kept
+            for term, term_postings in additions.get(shard, {}).items():
+                postings.setdefault(term, []).extend(term_postings)
+
+            if postings:
+                with atomic_open(self.shard_path(shard), 'w') as file:
+                    json.dump(postings, file, separators=(",", ":"), sort_keys=True)
+            elif os.path.exists(self.shard_path(shard)):
+                os.remove(self.shard_path(shard))
+
+        pages = {page["id"]: {"url": page["url"], "title": page["title"]} for page in self.pages.values()}
+        with atomic_open(os.path.join(self.output_dir, "pages.json"), 'w') as file:
+            json.dump({"prefix_length": self.prefix_length, "pages": pages}, file, separators=(",", ":"))
+        with atomic_open(os.path.join(self.output_dir, "search.js"), 'w') as file:
+            file.write(SEARCH_SCRIPT)
+
+        state_directory = os.path.dirname(self.state_path)
+        if state_directory:
+            os.makedirs(state_directory, exist_ok=True)
+        with open(self.state_path, 'w') as file:
+            json.dump({"version": GENERATOR_VERSION, "prefix_length": self.prefix_length, "next_id": self.next_id, "pages": self.pages}, file)
+
+        rewritten = sorted(self.dirty_shards)
+        self.dirty_ids = set()
+        self.dirty_shards = set()
+        self.reset = False
+        return rewritten
@@ -0,0 +1,214 @@
+import argparse
+import email.utils
+import functools
+import io
+import os
+import stat as stat_module
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from compress import compressed_up_to_date
+
+#content codings served from precompressed siblings, in order of preference
+ENCODINGS = (("gzip", ".gz"),)
+#files at least this big are sent with sendfile, straight from the page cache to the socket
+SENDFILE_MIN_BYTES = 256 * 1024
+#files bigger than this are never kept in memory
+MAX_CACHED_FILE_BYTES = 1024 * 1024
+
+
+def accepted_encodings(header):
+    #content codings of an Accept-Encoding header, without the ones refused with q=0
+    encodings = set()
+    for item in (header or "").split(","):
+        name, _, parameters = item.partition(";")
+        name = name.strip().lower()
+        quality = parameters.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            encodings.add(name)
+    return encodings
+
+
+def make_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def etag_matches(header, etag):
+    #weak comparison, as required for If-None-Match
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+class FileCache:
+    #bounded LRU cache of file contents, entries are checked against the size and modification time of the file on every hit
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+
+    def get(self, path, stat):
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+                return None
+            self.entries.move_to_end(path)
+            return entry[1]
+
+
+    def put(self, path, stat, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if path in self.entries:
+                self.size -= len(self.entries.pop(path)[1])
+            self.entries[path] = ((stat.st_mtime_ns, stat.st_size), data)
+            self.size += len(data)
+
+            #evicting the least recently used files until the cache fits its memory cap again
+            while self.size > self.max_bytes:
+                _, (_, old_data) = self.entries.popitem(last=False)
+                self.size -= len(old_data)
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    #serving a directory with ETag validation, precompressed siblings, sendfile for big files and an in-memory cache for small ones
+    def send_head(self):
+        url_path = urlsplit(self.path).path
+        path = self.translate_path(url_path)
+        if os.path.isdir(path):
+            index_path = os.path.join(path, "index.html")
+            if not url_path.endswith("/") or not os.path.isfile(index_path):
+                #redirects and directory listings are left to SimpleHTTPRequestHandler
+                return super().send_head()
+            path = index_path
+
+        #the file is opened first and every header comes from that open file, so a page replaced by a rename
+        #while it is served is sent whole, with the length and ETag of the version actually sent
+        try:
+            file = open(path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        try:
+            stat = os.fstat(file.fileno())
+            if not stat_module.S_ISREG(stat.st_mode) or path.endswith("/"):
+                self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+                file.close()
+                return None
+
+            content_type = self.guess_type(path)
+            encoding = None
+            accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+            for name, suffix in ENCODINGS:
+                if name in accepted and compressed_up_to_date(path, path + suffix, stat):
+                    try:
+                        compressed_file = open(path + suffix, 'rb')
+                    except OSError:
+                        #removed since it was checked, the uncompressed file is served instead
+                        continue
+                    file.close()
+                    file = compressed_file
+                    encoding = name
+                    path += suffix
+                    stat = os.fstat(file.fileno())
+                    break
+
+            etag = make_etag(stat)
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                file.close()
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return None
+
+            body = self.open_body(path, file, stat)
+        except BaseException:
+            file.close()
+            raise
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        return body
+
+
+    def open_body(self, path, file, stat):
+        #small files are served from memory, the others are streamed from the open file
+        file_cache = self.server.file_cache
+        if file_cache is None or stat.st_size > MAX_CACHED_FILE_BYTES:
+            return file
+
+        with file:
+            data = file_cache.get(path, stat)
+            if data is None:
+                data = file.read()
+                file_cache.put(path, stat, data)
+        return io.BytesIO(data)
+
+
+    def copyfile(self, source, outputfile):
+        if isinstance(source, io.BufferedReader) and os.fstat(source.fileno()).st_size >= SENDFILE_MIN_BYTES:
+            #the headers are already written to the socket, so the body can bypass the buffered writer
+            outputfile.flush()
+            self.connection.sendfile(source)
+            return
+        super().copyfile(source, outputfile)
+
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(directory, port, handler=StaticHandler, cache_bytes=64 * 1024 * 1024, quiet=False, host=""):
+    #threaded server for directory, cache_bytes 0 disables the in-memory cache
+    server = ThreadingHTTPServer((host, port), functools.partial(handler, directory=directory))
+    server.daemon_threads = True
+    server.file_cache = FileCache(cache_bytes) if cache_bytes > 0 else None
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve ./public with ETags, precompressed files and an in-memory cache")
+    parser.add_argument("--port", type=int, default=8888, help="port to listen on")
+    parser.add_argument("--bind", default="", help="address to listen on (every address by default)")
+    parser.add_argument("--directory", default="public", help="directory to serve")
+    parser.add_argument("--cache-size-mb", type=int, default=64,
+                        help="size of the in-memory cache of small files, 0 disables it")
+    parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    args = parser.parse_args()
+
+    server = make_server(args.directory, args.port, cache_bytes=args.cache_size_mb * 1024 * 1024, quiet=args.quiet, host=args.bind)
+    print(f"Serving {args.directory} on http://localhost:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
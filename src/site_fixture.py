@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+#template of the test sites, pages render as <title>...</title> followed by their html
+SITE_TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TempSite:
+    #unittest mixin giving every test its own temporary directory, removed after the test
+    #content, static, public and template are the paths of a site inside it, nothing is created until it is written
+    #test cases list it before unittest.TestCase, and call super().setUp() first when they extend setUp
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.public = self.path("public")
+        self.template = self.path("template.html")
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def path(self, *parts):
+        #a path inside the temporary directory, absolute paths are returned as they are
+        return os.path.join(self.tmp.name, *parts)
+
+
+    def write(self, path, data, mtime_ns=None):
+        #writing text or bytes to path (relative to the temporary directory), creating the missing directories
+        #returns the full path of the file
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb' if isinstance(data, bytes) else 'w') as file:
+            file.write(data)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+
+    def write_site(self, pages, assets={}):
+        #writing the site template, the pages and the static assets, given as {path relative to content or static: text}
+        self.write(self.template, SITE_TEMPLATE)
+        for name, text in pages.items():
+            self.write(os.path.join(self.content, name), text)
+        for name, data in assets.items():
+            self.write(os.path.join(self.static, name), data)
@@ -0,0 +1,75 @@
+import os
+
+
+def page_url(dest_path, public_dir):
+    #url of a generated page, index.html pages are served at their directory url
+    relative_path = os.path.relpath(dest_path, public_dir).replace(os.sep, "/")
+    if relative_path == "index.html":
+        return "/"
+    if relative_path.endswith("/index.html"):
+        return "/" + relative_path[:-len("index.html")]
+    return "/" + relative_path
+
+
+class SiteIndex:
+    #in-memory index of every published page and its front matter, filled during the page traversal
+    #listeners are called with the entry of every page as soon as it is published (its title is known)
+    def __init__(self, public_dir, listeners=()):
+        self.public_dir = public_dir
+        self.pages = []
+        self.pages_by_src = {}
+        self.listeners = list(listeners)
+
+
+    def add(self, src_path, dest_path, metadata, title=None):
+        if isinstance(metadata.get("tags"), str):
+            metadata["tags"] = [metadata["tags"]]
+        entry = {
+            "src": src_path,
+            "dest": dest_path,
+            "url": page_url(dest_path, public_dir=self.public_dir),
+            "title": metadata.get("title", title),
+            "metadata": metadata,
+        }
+        self.pages.append(entry)
+        self.pages_by_src[src_path] = entry
+        return entry
+
+
+    def set_title(self, src_path, title):
+        #titles from front matter take precedence over the title of the document
+        entry = self.pages_by_src.get(src_path)
+        if entry is not None and "title" not in entry["metadata"]:
+            entry["title"] = title
+
+
+    def publish(self, src_path, title):
+        #called once a page was generated or found up to date, so listeners can stream it out
+        self.set_title(src_path, title)
+        entry = self.pages_by_src.get(src_path)
+        if entry is not None:
+            for listener in self.listeners:
+                listener(entry)
+
+
+    def get(self, src_path):
+        return self.pages_by_src.get(src_path)
+
+
+    def with_tag(self, tag):
+        return [entry for entry in self.pages if tag in entry["metadata"].get("tags", [])]
+
+
+    def tags(self):
+        #mapping every tag to the pages using it
+        tags = {}
+        for entry in self.pages:
+            for tag in entry["metadata"].get("tags", []):
+                tags.setdefault(tag, []).append(entry)
+        return tags
+
+
+    def by_date(self, newest_first=True):
+        #pages with a date, sorted by it (dates are compared as strings, so they should be written as YYYY-MM-DD)
+        dated = [entry for entry in self.pages if "date" in entry["metadata"]]
+        return sorted(dated, key=lambda entry: str(entry["metadata"]["date"]), reverse=newest_first)
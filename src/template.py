@@ -0,0 +1,50 @@
+import re
+
+#placeholders look like {{ Title }} or {{ Content }}
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+
+class Template:
+    #page template split once into literal segments and named slots, so pages can be written without building the full page string
+    def __init__(self, text, path=None):
+        self.path = path
+        self.literals = []
+        self.slots = []
+
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.literals.append(text[position:match.start()])
+            self.slots.append((match.group(1), match.group()))
+            position = match.end()
+        #there is always one more literal than slots, the text after the last slot
+        self.literals.append(text[position:])
+
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as file:
+            return cls(file.read(), path)
+
+
+    def write(self, file, values):
+        #writing the literal segments and the slot values straight to the file
+        #a slot value can be a string, or an HTMLNode which is streamed into the file
+        #slots without a value are written back unchanged
+        for literal, (name, placeholder) in zip(self.literals, self.slots):
+            file.write(literal)
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                file.write(value)
+            else:
+                value.render_to(file)
+        file.write(self.literals[-1])
+
+
+    def render(self, values):
+        parts = []
+        for literal, (name, placeholder) in zip(self.literals, self.slots):
+            parts.append(literal)
+            value = values.get(name, placeholder)
+            parts.append(value if isinstance(value, str) else value.to_html())
+        parts.append(self.literals[-1])
+        return ''.join(parts)
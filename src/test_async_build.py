@@ -0,0 +1,66 @@
+import asyncio
+import os
+import unittest
+
+from async_build import generate_pages_async
+from helpers import generate_pages_recursive
+from manifest import BuildManifest
+from output import MemoryOutput
+from site_fixture import TempSite
+from site_index import SiteIndex
+
+
+class TestGeneratePagesAsync(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.public)
+        pages = {"index.md": "# Home", "blog/broken.md": "no title", "blog/draft.md": "---\ndraft: true\n---\n# Draft"}
+        for number in range(10):
+            pages[f"blog/post{number}.md"] = f"# Post {number}\n\nText of *post* {number}"
+        self.write_site(pages)
+        
+        
+    def build(self, **kwargs):
+        return asyncio.run(generate_pages_async(self.content, self.template, self.public, **kwargs))
+    
+    
+    def test_incomplete_build_fails(self):
+        assert asyncio.run(generate_pages_async(self.path("missing"), self.template, self.public)) == 1
+        
+        
+    def test_same_output_as_generate_pages_recursive(self):
+        async_output = MemoryOutput()
+        sync_output = MemoryOutput()
+        assert self.build(output=async_output, max_in_flight=3, io_threads=2) == 1
+        assert generate_pages_recursive(self.content, self.template, self.public, output=sync_output) == 1
+        assert async_output.files == sync_output.files
+        assert len(async_output.files) == 11
+        
+        
+    def test_pages_recorded_in_discovery_order(self):
+        async_index = SiteIndex(self.public)
+        sync_index = SiteIndex(self.public)
+        self.build(site_index=async_index, output=MemoryOutput(), max_in_flight=1)
+        generate_pages_recursive(self.content, self.template, self.public, site_index=sync_index, output=MemoryOutput())
+        assert [entry["src"] for entry in async_index.pages] == [entry["src"] for entry in sync_index.pages]
+        assert async_index.get(os.path.join(self.content, "blog", "post3.md"))["title"] == "Post 3"
+        
+        
+    def test_incremental_build(self):
+        manifest_path = self.path("manifest.json")
+        manifest = BuildManifest(manifest_path, "t1")
+        self.build(manifest=manifest)
+        manifest.save()
+        
+        with open(os.path.join(self.public, "blog", "post1.html")) as file:
+            assert file.read() == "<title>Post 1</title><div><h1>Post 1</h1><p>Text of <i>post</i> 1</p></div>"
+        
+        self.write(os.path.join(self.content, "blog", "post1.md"), "# Edited")
+        manifest = BuildManifest(manifest_path, "t1")
+        output = MemoryOutput()
+        self.build(manifest=manifest, output=output)
+        assert list(output.files) == [os.path.join(self.public, "blog", "post1.html")]
+        
+        
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from bench.corpus import generate_corpus
+from bench.stages import STAGES, STRESS_INPUTS, check_stress, compare_results, run_benchmark, run_stress
+from markdown_functions import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_same_seed_same_corpus(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            first_paths = generate_corpus(first, pages=4, mix="mixed", size=1, seed=3, pages_per_dir=2)
+            second_paths = generate_corpus(second, pages=4, mix="mixed", size=1, seed=3, pages_per_dir=2)
+            for first_path, second_path in zip(first_paths, second_paths):
+                assert os.path.relpath(first_path, first) == os.path.relpath(second_path, second)
+                with open(first_path) as first_file, open(second_path) as second_file:
+                    assert first_file.read() == second_file.read()
+            assert len(os.listdir(first)) == 2
+            
+            
+    def test_unknown_mix(self):
+        with tempfile.TemporaryDirectory() as dest:
+            with self.assertRaises(ValueError):
+                generate_corpus(dest, pages=1, mix="unknown")
+                
+                
+    def test_quotes_mix_is_nested(self):
+        with tempfile.TemporaryDirectory() as dest:
+            paths = generate_corpus(dest, pages=1, mix="quotes", size=1)
+            with open(paths[0]) as file:
+                html = markdown_to_html_node(file.read()).to_html()
+            assert html.count("<blockquote>") >= 6
+            
+            
+    def test_pathological_mix(self):
+        with tempfile.TemporaryDirectory() as dest:
+            paths = generate_corpus(dest, pages=1, mix="pathological", size=1)
+            with open(paths[0]) as file:
+                assert "[" * 2000 in file.read()
+                
+                
+class TestStages(unittest.TestCase):
+    def test_run_benchmark(self):
+        with tempfile.TemporaryDirectory() as dest:
+            paths = generate_corpus(dest, pages=2, mix="small", size=1)
+            template_path = os.path.join(dest, "template.html")
+            with open(template_path, 'w') as file:
+                file.write("<title>{{ Title }}</title>{{ Content }}")
+            results = run_benchmark(paths, template_path, repeat=1)
+        assert results["meta"]["pages"] == 2
+        assert list(results["stages"]) == list(STAGES)
+        
+        
+    def test_compare_results(self):
+        baseline = {"stages": {"read": {"seconds": 1.0}, "to_html": {"seconds": 1.0}}}
+        current = {"stages": {"read": {"seconds": 1.05}, "to_html": {"seconds": 1.5}}}
+        regressions, report = compare_results(baseline, current, threshold=0.10)
+        assert regressions == ["to_html"]
+        assert "REGRESSION" in report
+
+        
+        
+class TestStress(unittest.TestCase):
+    def test_parsers_are_linear(self):
+        #a quadratic parser takes seconds on these inputs, hundreds of times over the bound
+        results = run_stress(size=16 * 1024, repeat=1)
+        assert list(results) == list(STRESS_INPUTS)
+        slow, report = check_stress(results)
+        assert slow == [], report
+        
+        
+    def test_check_stress(self):
+        slow, report = check_stress({"fast": 1.0, "slow": 50.0}, max_ms_per_kb=20.0)
+        assert slow == ["slow"]
+        assert "TOO SLOW" in report        
+        
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import unittest
+
+from block_cache import BlockCache, RenderedNode, block_cache
+from htmlnode import LeafNode, ParentNode
+from markdown_functions import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        assert cache.get("text") is None
+        rendered = cache.put("text", ParentNode("p", [LeafNode(None, "text")]))
+        assert cache.get("text") is rendered
+        assert cache.stats() == {"entries": 1, "bytes": sys.getsizeof("text") + rendered.size, "hits": 1, "misses": 1}
+        
+        
+    def test_rendered_node(self):
+        node = ParentNode("p", [LeafNode("b", "bold")])
+        rendered = BlockCache().put("**bold**", node)
+        assert isinstance(rendered, RenderedNode)
+        assert rendered.tag == "p"
+        assert rendered.children == node.children
+        assert rendered.to_html() == "<p><b>bold</b></p>"
+        assert list(rendered.iter_html()) == ["<p><b>bold</b></p>"]
+        
+        
+    def test_memory_cap_evicts_least_recently_used(self):
+        entry_size = sys.getsizeof("a") + RenderedNode(LeafNode("p", "a"), "<p>a</p>").size
+        cache = BlockCache(max_bytes=entry_size * 2)
+        cache.put("a", LeafNode("p", "a"))
+        cache.put("b", LeafNode("p", "b"))
+        cache.get("a")
+        cache.put("c", LeafNode("p", "c"))
+        assert list(cache.entries) == ["a", "c"]
+        assert cache.size <= entry_size * 2
+        
+        
+    def test_size_counts_node_tree(self):
+        text = "word " * 100
+        small = RenderedNode(LeafNode("p", "text"), "<p>text</p>")
+        large = RenderedNode(ParentNode("p", [LeafNode(None, text), LeafNode("b", text)]), "<p>text</p>")
+        assert large.size > small.size + 2 * len(text)
+        
+        
+    def test_entry_bigger_than_cap(self):
+        cache = BlockCache(max_bytes=5)
+        rendered = cache.put("long block", LeafNode("p", "long block"))
+        assert rendered.to_html() == "<p>long block</p>"
+        assert cache.stats()["entries"] == 0
+        
+        
+    def test_disabled(self):
+        cache = BlockCache(max_bytes=0)
+        node = LeafNode("p", "text")
+        assert cache.put("text", node) is node
+        assert cache.get("text") is None
+        
+        
+class TestMarkdownWithBlockCache(unittest.TestCase):
+    def test_repeated_blocks(self):
+        block_cache.clear()
+        footer = "Copyright of the **Tolkien** fan club."
+        first = markdown_to_html_node(f"# First\n\n{footer}")
+        second = markdown_to_html_node(f"# Second\n\n{footer}")
+        assert block_cache.hits == 1
+        assert second.children[1].tag == "p"
+        assert second.to_html() == "<div><h1>Second</h1><p>Copyright of the <b>Tolkien</b> fan club.</p></div>"
+        assert first.children[1].to_html() == second.children[1].to_html()
+        
+        
+if __name__ == "__main__":
+    unittest.main()
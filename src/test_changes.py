@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+
+from changes import OutputChanges, scan_outputs, write_changes
+from manifest import hash_bytes
+from site_fixture import TempSite
+
+
+class TestOutputChanges(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.state_path = self.path("state.json")
+        self.changes_path = self.path("changes.json")
+        self.write("public/index.html", "<h1>Home</h1>")
+        self.write("public/blog/post.html", "<h1>Post</h1>")
+        
+        
+    def changes(self):
+        changes = write_changes(self.changes_path, self.public, self.state_path)
+        with open(self.changes_path) as file:
+            assert json.load(file) == changes
+        return {kind: [change["path"] for change in paths] for kind, paths in changes.items()}
+    
+    
+    def test_scan_outputs(self):
+        assert sorted(path for path, _ in scan_outputs(self.public)) == ["blog/post.html", "index.html"]
+        
+        
+    def test_temporary_files_are_skipped(self):
+        #left behind by a build that crashed while writing
+        self.write("public/blog/.post.html.x1y2z3.tmp", "<h1>Po")
+        self.write("public/notes.tmp", "kept")
+        assert sorted(path for path, _ in scan_outputs(self.public)) == ["blog/post.html", "index.html", "notes.tmp"]
+        
+        
+    def test_first_build_adds_everything(self):
+        changes = write_changes(self.changes_path, self.public, self.state_path)
+        assert changes["added"] == [
+            {"path": "blog/post.html", "sha256": hash_bytes(b"<h1>Post</h1>")},
+            {"path": "index.html", "sha256": hash_bytes(b"<h1>Home</h1>")},
+        ]
+        
+        
+    def test_delta(self):
+        self.changes()
+        self.write("public/index.html", "<h1>New home</h1>")
+        self.write("public/about.html", "<h1>About</h1>")
+        os.remove(os.path.join(self.public, "blog", "post.html"))
+        assert self.changes() == {"added": ["about.html"], "modified": ["index.html"], "deleted": ["blog/post.html"]}
+        assert self.changes() == {"added": [], "modified": [], "deleted": []}
+        
+        
+    def test_rewritten_with_same_content(self):
+        self.changes()
+        self.write("public/index.html", "<h1>Home</h1>", mtime_ns=5_000_000_000)
+        assert self.changes() == {"added": [], "modified": [], "deleted": []}
+        
+        
+    def test_unchanged_files_are_not_hashed(self):
+        self.changes()
+        output_changes = OutputChanges(self.state_path, self.public)
+        #a corrupted hash in the state is kept, since size and modification time did not change
+        output_changes.previous_files["index.html"][2] = "stale"
+        output_changes.compute()
+        assert output_changes.files["index.html"][2] == "stale"
+        
+        
+if __name__ == "__main__":
+    unittest.main()
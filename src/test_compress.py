@@ -0,0 +1,60 @@
+import gzip
+import lzma
+import os
+import unittest
+
+from compress import Compressor, compress_file, compressed_up_to_date, parse_formats, remove_compressed
+from site_fixture import TempSite
+
+
+class TestCompress(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self.write("index.html", "<h1>Lord of the Rings</h1>" * 20, mtime_ns=1_000_000_000)
+        
+        
+    def test_parse_formats(self):
+        assert parse_formats("gz, xz") == ["gz", "xz"]
+        with self.assertRaises(ValueError):
+            parse_formats("gz,zip")
+            
+            
+    def test_compress_file(self):
+        assert compress_file(self.page, ["gz", "xz"]) == [self.page + ".gz", self.page + ".xz"]
+        with open(self.page, 'rb') as file:
+            data = file.read()
+        with gzip.open(self.page + ".gz", 'rb') as file:
+            assert file.read() == data
+        with lzma.open(self.page + ".xz", 'rb') as file:
+            assert file.read() == data
+            
+            
+    def test_skips_up_to_date(self):
+        compress_file(self.page, ["gz"])
+        assert compressed_up_to_date(self.page, self.page + ".gz")
+        assert compress_file(self.page, ["gz"]) == []
+        
+        self.write(self.page, "<h1>Changed</h1>", mtime_ns=2_000_000_000)
+        assert not compressed_up_to_date(self.page, self.page + ".gz")
+        assert compress_file(self.page, ["gz"]) == [self.page + ".gz"]
+        with gzip.open(self.page + ".gz", 'rb') as file:
+            assert file.read() == b"<h1>Changed</h1>"
+            
+            
+    def test_compressor(self):
+        image_path = self.write("image.png", b"\x89PNG")
+        compressor = Compressor(["gz", "bz2"], level=1, workers=2)
+        compressor.submit(self.page)
+        compressor.submit(image_path)
+        assert compressor.close() == 2
+        assert not os.path.exists(image_path + ".gz")
+        
+        
+    def test_remove_compressed(self):
+        compress_file(self.page, ["gz", "bz2"])
+        remove_compressed(self.page)
+        assert sorted(os.listdir(self.tmp.name)) == ["index.html"]
+        
+        
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import pickle
+import unittest
+
+from disk_cache import DiskCache
+from markdown_functions import markdown_to_html_node
+from site_fixture import TempSite
+
+
+class TestDiskCache(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_path = self.path("cache", "render_cache.sqlite")
+        self.cache = DiskCache(self.cache_path)
+
+
+    def tearDown(self):
+        self.cache.close()
+        super().tearDown()
+
+
+    def store(self, cache, content):
+        cache.put(content, "Title", markdown_to_html_node(content))
+
+
+    def test_miss(self):
+        assert self.cache.get("# Page") is None
+
+
+    def test_hit_across_instances(self):
+        self.store(self.cache, "# Page\n\nSome **text**")
+        self.cache.close()
+
+        other = DiskCache(self.cache_path)
+        title, tree = other.get("# Page\n\nSome **text**")
+        assert title == "Title"
+        assert tree.to_html() == "<div><h1>Page</h1><p>Some <b>text</b></p></div>"
+        assert tree.tag == "div"
+        assert tree.children[0].tag == "h1"
+        other.close()
+
+
+    def test_undecodable_entries_are_misses(self):
+        #entries are never unpickled, and anything that is not a tree written by the cache is rendered again
+        self.store(self.cache, "# Page")
+        connection = self.cache.connect()
+        for tree in (pickle.dumps(print), b"\x80\x05", "not json", "[1, 2]", '["div", null, null, [["b", null, null, null, null]], null]'):
+            connection.execute("UPDATE pages SET tree = ?", (tree,))
+            connection.commit()
+            assert self.cache.get("# Page") is None
+        self.store(self.cache, "# Page")
+        assert self.cache.get("# Page")[1].to_html() == "<div><h1>Page</h1></div>"
+
+
+    def test_eviction_keeps_recent_entries(self):
+        self.store(self.cache, "# Old")
+        self.store(self.cache, "# New")
+        self.cache.max_bytes = self.cache.total_size() - 1
+        assert self.cache.evict() == 1
+        assert self.cache.get("# Old") is None
+        assert self.cache.get("# New") is not None
+
+
+    def test_uses_are_written_once(self):
+        self.store(self.cache, "# Old")
+        self.store(self.cache, "# New")
+        connection = self.cache.connect()
+        connection.execute("UPDATE pages SET used = 0")
+        connection.commit()
+
+        assert self.cache.get("# Old") is not None
+        self.cache.mark_used("# Old")
+        assert connection.execute("SELECT used FROM pages WHERE key = ?", (self.cache.key("# Old"),)).fetchone()[0] == 0
+
+        self.cache.max_bytes = self.cache.total_size() - 1
+        assert self.cache.evict() == 1
+        assert self.cache.get("# New") is None
+        assert self.cache.get("# Old") is not None
+
+
+    def test_clear(self):
+        self.store(self.cache, "# Page")
+        self.cache.clear()
+        assert not os.path.exists(self.cache_path)
+        assert self.cache.get("# Page") is None
+
+
+if __name__ == "__main__":
+    unittest.main()
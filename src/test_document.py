@@ -0,0 +1,51 @@
+import unittest
+
+from document import parse_document
+from markdown_functions import markdown_to_html_node, extract_title
+
+
+class TestParseDocument(unittest.TestCase):
+    def test_document(self):
+        markdown = """Intro paragraph with **bold** text.
+
+# Main title
+
+## Section
+
+```
+code is not counted
+```
+
+* item one
+* item two"""
+        document = parse_document(markdown)
+        
+        assert document.title == "Main title"
+        assert document.title == extract_title(markdown)
+        assert document.headings == [(1, "Main title"), (2, "Section")]
+        assert [block_type for block_type, _ in document.blocks] == ["paragraph", "heading", "heading", "code", "unordered_list"]
+        assert document.word_count == 5 + 2 + 1 + 4
+        assert document.node.to_html() == markdown_to_html_node(markdown).to_html()
+        
+        
+    def test_word_count_skips_markers(self):
+        document = parse_document("> quoted words\n> > - nested item\n\n1. first\n2. second")
+        assert document.word_count == 2 + 2 + 2
+        
+        
+    def test_no_title(self):
+        document = parse_document("## Only a subheading")
+        assert document.title is None
+        with self.assertRaises(Exception):
+            document.require_title()
+            
+            
+    def test_empty_document(self):
+        document = parse_document("")
+        assert document.blocks == []
+        assert document.headings == []
+        assert document.node.to_html() == "<div></div>"
+        
+        
+if __name__ == "__main__":
+    unittest.main()
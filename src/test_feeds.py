@@ -0,0 +1,136 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree
+
+from feeds import AtomWriter, FeedWriter, SitemapWriter, page_datetime
+from site_fixture import TempSite
+from site_index import SiteIndex
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+class TestSitemapWriter(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.public)
+
+
+    def write(self, count, max_urls):
+        sitemap = SitemapWriter(self.public, "https://example.com/", max_urls)
+        for number in range(count):
+            sitemap.add(f"/page-{number}.html", datetime(2024, 1, 2, tzinfo=timezone.utc))
+        sitemap.close()
+
+
+    def locations(self, file_name, tag):
+        root = ElementTree.parse(os.path.join(self.public, file_name)).getroot()
+        return [element.text for element in root.iter(f"{SITEMAP_NS}{tag}")]
+
+
+    def test_single_sitemap(self):
+        self.write(3, 10)
+        assert self.locations("sitemap.xml", "loc")[0] == "https://example.com/page-0.html"
+        assert self.locations("sitemap.xml", "lastmod") == ["2024-01-02"] * 3
+        assert sorted(os.listdir(self.public)) == ["sitemap.xml"]
+
+
+    def test_split_sitemap(self):
+        self.write(5, 2)
+        assert self.locations("sitemap.xml", "loc") == [
+            "https://example.com/sitemap-1.xml",
+            "https://example.com/sitemap-2.xml",
+            "https://example.com/sitemap-3.xml",
+        ]
+        assert len(self.locations("sitemap-3.xml", "loc")) == 1
+
+
+    def test_removes_leftover_parts(self):
+        self.write(5, 2)
+        self.write(2, 2)
+        assert sorted(os.listdir(self.public)) == ["sitemap.xml"]
+
+
+class TestAtomWriter(unittest.TestCase):
+    def test_feed(self):
+        with tempfile.TemporaryDirectory() as public:
+            path = os.path.join(public, "atom.xml")
+            atom = AtomWriter(path, "https://example.com", "Tolkien & friends")
+            atom.add("/majesty/", "Majesty <3", datetime(2024, 1, 2, tzinfo=timezone.utc))
+            atom.close()
+            root = ElementTree.parse(path).getroot()
+            assert root.find(f"{ATOM_NS}title").text == "Tolkien & friends"
+            entry = root.find(f"{ATOM_NS}entry")
+            assert entry.find(f"{ATOM_NS}title").text == "Majesty <3"
+            assert entry.find(f"{ATOM_NS}id").text == "https://example.com/majesty/"
+            assert entry.find(f"{ATOM_NS}updated").text == "2024-01-02T00:00:00+00:00"
+            assert root.find(f"{ATOM_NS}author/{ATOM_NS}name").text == "Tolkien & friends"
+
+
+    def test_updated_is_newest_entry(self):
+        with tempfile.TemporaryDirectory() as public:
+            path = os.path.join(public, "atom.xml")
+            contents = []
+            for _ in range(2):
+                atom = AtomWriter(path, "https://example.com", "Feed", "Bilbo")
+                atom.add("/a/", "A", datetime(2024, 1, 2, tzinfo=timezone.utc))
+                atom.add("/b/", "B", datetime(2024, 3, 4, 12, tzinfo=timezone.utc))
+                atom.close()
+                with open(path) as file:
+                    contents.append(file.read())
+            assert contents[0] == contents[1]
+            root = ElementTree.parse(path).getroot()
+            assert root.find(f"{ATOM_NS}updated").text == "2024-03-04T12:00:00+00:00"
+            assert root.find(f"{ATOM_NS}author/{ATOM_NS}name").text == "Bilbo"
+
+
+    def test_entries_are_not_held_in_memory(self):
+        #about 1 MB of entries, spooled to a temporary file instead of being kept until the feed is closed
+        with tempfile.TemporaryDirectory() as public:
+            path = os.path.join(public, "atom.xml")
+            atom = AtomWriter(path, "https://example.com", "Feed")
+            tracemalloc.start()
+            try:
+                for number in range(10000):
+                    atom.add(f"/pages/page-{number}.html", f"Page number {number}", datetime(2024, 1, 2, tzinfo=timezone.utc))
+                held = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            assert held < 100 * 1024
+            atom.close()
+            root = ElementTree.parse(path).getroot()
+            entries = root.findall(f"{ATOM_NS}entry")
+            assert len(entries) == 10000
+            assert entries[-1].find(f"{ATOM_NS}title").text == "Page number 9999"
+
+
+class TestFeedWriter(unittest.TestCase):
+    def test_page_datetime(self):
+        assert page_datetime({"date": "2024-03-01"}, "unused") == datetime(2024, 3, 1, tzinfo=timezone.utc)
+        date = page_datetime({"date": "2024-03-01T10:00:00+02:00"}, "unused")
+        assert date.utcoffset() == timedelta(hours=2)
+        assert date == datetime(2024, 3, 1, 8, tzinfo=timezone.utc)
+
+
+    def test_published_pages(self):
+        with tempfile.TemporaryDirectory() as public:
+            src = os.path.join(public, "a.md")
+            with open(src, 'w') as file:
+                file.write("# A")
+            feed_writer = FeedWriter(public, "https://example.com", "Feed")
+            index = SiteIndex(public, [feed_writer])
+            index.add(src, os.path.join(public, "index.html"), {})
+            index.add(src + ".draft", os.path.join(public, "b.html"), {})
+            index.publish(src, "A")
+            feed_writer.close()
+            root = ElementTree.parse(os.path.join(public, "sitemap.xml")).getroot()
+            assert [element.text for element in root.iter(f"{SITEMAP_NS}loc")] == ["https://example.com/"]
+            root = ElementTree.parse(os.path.join(public, "atom.xml")).getroot()
+            assert [element.text for element in root.iter(f"{ATOM_NS}title")] == ["Feed", "A"]
+
+
+if __name__ == "__main__":
+    unittest.main()
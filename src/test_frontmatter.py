@@ -0,0 +1,71 @@
+import unittest
+
+from frontmatter import parse_front_matter
+from markdown_functions import extract_title
+
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        text = "# Title\n\nSome text"
+        assert parse_front_matter(text) == ({}, text)
+        
+        
+    def test_values(self):
+        text = """---
+title: "Hello: world"
+date: 2024-05-01
+draft: false
+order: 3
+tags: [tolkien, books]
+# a comment
+template: layouts/post.html
+---
+# Title
+"""
+        metadata, body = parse_front_matter(text)
+        assert metadata == {
+            "title": "Hello: world",
+            "date": "2024-05-01",
+            "draft": False,
+            "order": 3,
+            "tags": ["tolkien", "books"],
+            "template": "layouts/post.html",
+        }
+        assert body == "# Title\n"
+        
+        
+    def test_block_list(self):
+        text = "---\ntags:\n  - elves\n  - 'dwarves'\ndraft: yes\n---\nBody"
+        metadata, body = parse_front_matter(text)
+        assert metadata == {"tags": ["elves", "dwarves"], "draft": True}
+        assert body == "Body"
+        
+        
+    def test_string_keys(self):
+        metadata, _ = parse_front_matter("---\ntitle: 1984\ntemplate: true\norder: 1984\n---\nBody")
+        assert metadata == {"title": "1984", "template": "true", "order": 1984}
+        metadata, _ = parse_front_matter("---\ntitle: 'yes'\n---\nBody")
+        assert metadata == {"title": "yes"}
+        
+        
+    def test_unclosed_front_matter(self):
+        text = "---\nNot front matter\n"
+        assert parse_front_matter(text) == ({}, text)
+        
+        
+    def test_horizontal_rules(self):
+        text = "---\n\nSome paragraph\n\n---\n\nMore"
+        assert parse_front_matter(text) == ({}, text)
+        assert parse_front_matter("---\njust some text\n---\nBody") == ({}, "---\njust some text\n---\nBody")
+        assert parse_front_matter("---\n\n---\nBody") == ({}, "---\n\n---\nBody")
+        
+        
+    def test_page_starting_with_horizontal_rule(self):
+        text = "---\n\n# Title\n\nSome paragraph\n\n---\n\nMore"
+        metadata, body = parse_front_matter(text)
+        assert metadata == {}
+        assert extract_title(body) == "Title"
+            
+            
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import io
+import os
+import tempfile
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from disk_cache import DiskCache
+from helpers import bounded_map, find_pages, generate_pages_recursive, iter_chunks, render_content, sync_contents
+from htmlnode import HTMLNode
+from manifest import BuildManifest
+from site_fixture import TempSite
+
+
+class TestSyncContents(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = self.path("manifest.json")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+
+
+    def sync(self, **kwargs):
+        manifest = BuildManifest(self.manifest_path, "t1")
+        copied = sync_contents(self.static, self.public, manifest, **kwargs)
+        manifest.remove_stale()
+        manifest.save()
+        return sorted(os.path.relpath(path, self.public) for path in copied)
+
+
+    def test_first_sync_copies_everything(self):
+        assert self.sync() == ["images/logo.png", "index.css"]
+        with open(os.path.join(self.public, "images", "logo.png")) as file:
+            assert file.read() == "png"
+
+
+    def test_unchanged_files_are_skipped(self):
+        self.sync()
+        assert self.sync() == []
+        assert self.sync(use_hash=True) == []
+
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        assert self.sync() == ["index.css"]
+
+
+    def test_generated_files_are_kept(self):
+        self.sync()
+        page = os.path.join(self.public, "index.html")
+        self.write(page, "<html></html>")
+        self.sync()
+        assert os.path.exists(page)
+
+
+    def test_orphans_are_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "index.css"))
+        self.sync()
+        assert not os.path.exists(os.path.join(self.public, "index.css"))
+        assert os.path.exists(os.path.join(self.public, "images", "logo.png"))
+
+
+    def test_hard_links(self):
+        self.sync(link=True)
+        dest_stat = os.stat(os.path.join(self.public, "index.css"))
+        src_stat = os.stat(os.path.join(self.static, "index.css"))
+        assert dest_stat.st_ino == src_stat.st_ino
+        assert self.sync(link=True) == []
+
+
+
+class TestFindPages(TempSite, unittest.TestCase):
+    def test_stable_order(self):
+        for path in ("z.md", "a.md", "notes.txt", "b/c.md", "a.md.d/x.md"):
+            self.write(os.path.join(self.content, path), "# Page")
+        pages = [(os.path.relpath(src, self.content), os.path.relpath(dest, self.public)) for src, dest in find_pages(self.content, self.public)]
+        assert pages == [
+            ("a.md", "a.html"),
+            (os.path.join("a.md.d", "x.md"), os.path.join("a.md.d", "x.html")),
+            (os.path.join("b", "c.md"), os.path.join("b", "c.html")),
+            ("z.md", "z.html"),
+        ]
+        assert os.path.isdir(os.path.join(self.public, "b"))
+
+
+class TestBoundedMap(unittest.TestCase):
+    def test_chunks(self):
+        assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+    def test_order_and_backpressure(self):
+        pulled = []
+        def items():
+            for item in range(10):
+                pulled.append(item)
+                yield item
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = bounded_map(pool, lambda item: item * item, items(), 3)
+            assert next(results) == (0, 0)
+            assert len(pulled) == 3
+            assert list(results) == [(item, item * item) for item in range(1, 10)]
+
+
+
+class TestRenderContent(unittest.TestCase):
+    def test_disk_cache_keeps_streaming(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            disk_cache = DiskCache(os.path.join(tmp, "render_cache.sqlite"))
+            terms = {}
+            title, page_content = render_content("page.md", disk_cache, "# Page\n\nSome text", None, terms)
+            assert title == "Page"
+            assert isinstance(page_content, HTMLNode)
+
+            cached_terms = {}
+            title, cached_content = render_content("page.md", disk_cache, "# Page\n\nSome text", None, cached_terms)
+            assert title == "Page"
+            assert isinstance(cached_content, HTMLNode)
+            assert cached_content.to_html() == page_content.to_html()
+            assert cached_terms == terms
+            disk_cache.close()
+
+
+    def test_disk_cache_requires_a_title(self):
+        #a page without h1 builds only with a title from the front matter, whether it is cached or not
+        with tempfile.TemporaryDirectory() as tmp:
+            disk_cache = DiskCache(os.path.join(tmp, "render_cache.sqlite"))
+            assert render_content("page.md", disk_cache, "Some text", "Custom")[0] == "Custom"
+            assert render_content("page.md", disk_cache, "Some text", "Other")[0] == "Other"
+            with self.assertRaises(Exception):
+                render_content("page.md", disk_cache, "Some text")
+            with self.assertRaises(Exception):
+                render_content("page.md", None, "Some text")
+            disk_cache.close()
+
+
+class TestGeneratePages(TempSite, unittest.TestCase):
+    def build(self, jobs):
+        #building the site into its own public directory, returning (failures, manifest, outputs, printed lines)
+        public = self.path(f"public{jobs}")
+        manifest = BuildManifest(self.path(f"manifest{jobs}.json"), "t1")
+        printed = io.StringIO()
+        with redirect_stdout(printed):
+            failures = generate_pages_recursive(self.content, self.template, public, manifest, jobs)
+        outputs = {}
+        for root, _, file_names in os.walk(public):
+            for file_name in file_names:
+                with open(os.path.join(root, file_name), 'rb') as file:
+                    outputs[os.path.relpath(os.path.join(root, file_name), public)] = file.read()
+        return failures, manifest, outputs, printed.getvalue().splitlines()
+
+
+    def test_process_pool(self):
+        #more pages than a chunk, rendered by real worker processes, with one broken page in the middle
+        pages = {f"blog/post{number:02}.md": f"# Post {number}\n\nText of *post* {number}" for number in range(20)}
+        pages["blog/post09.md"] = "no title"
+        self.write_site(pages)
+
+        failures, manifest, outputs, printed = self.build(1)
+        pool_failures, pool_manifest, pool_outputs, pool_printed = self.build(2)
+
+        broken = os.path.join(self.content, "blog", "post09.md")
+        assert failures == pool_failures == 1
+        assert f"An error occurred while generating {broken}: No header was found" in pool_printed
+        assert [line for line in pool_printed if line.startswith("An error")] == [line for line in printed if line.startswith("An error")]
+        assert list(pool_manifest.pages) == list(manifest.pages)
+        assert len(pool_manifest.pages) == 19 and broken not in pool_manifest.pages
+        assert pool_outputs == outputs
+        assert len(outputs) == 19
+
+
+    def test_incomplete_build_fails(self):
+        #pages that were never discovered are failures too, the build must not look successful
+        self.write_site({})
+        for jobs in (1, 2):
+            assert generate_pages_recursive(self.path("missing"), self.template, self.public, jobs=jobs) == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
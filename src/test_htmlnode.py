@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import *
@@ -209,6 +210,55 @@ class TestParentNode(unittest.TestCase):
         expected = "<div><span></span><p>Non-empty text</p></div>"
         assert node.to_html() == expected
                         
+
+        
+class TestNodeLayout(unittest.TestCase):
+    def test_nodes_have_no_instance_dict(self):
+        assert not hasattr(HTMLNode("p"), "__dict__")
+        assert not hasattr(LeafNode("p", "text"), "__dict__")
+        assert not hasattr(ParentNode("div", [LeafNode("p", "text")]), "__dict__")
+        
+        
+class TestStreamingHTML(unittest.TestCase):
+    def test_iter_html_fragments(self):
+        node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])
+        assert list(node.iter_html()) == ["<p>", "<b>Bold</b>", " text", "</p>"]
+        
+        
+    def test_render_to_writer(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])]),
+                LeafNode("a", "link", {"href": "https://boot.dev"}),
+            ],
+            {"class": "content"},
+        )
+        writer = io.StringIO()
+        node.render_to(writer)
+        assert writer.getvalue() == node.to_html()
+        assert writer.getvalue() == '<div class="content"><ul><li>item</li></ul><a href="https://boot.dev">link</a></div>'
+        
+        
+    def test_render_to_empty_tag(self):
+        node = ParentNode("", [LeafNode("p", "first"), LeafNode("p", "second")])
+        writer = io.StringIO()
+        node.render_to(writer)
+        assert writer.getvalue() == "<p>first</p><p>second</p>"
+        
+        
+    def test_render_to_no_tag(self):
+        node = ParentNode(tag=None, children=[LeafNode("p", "text")])
+        with self.assertRaises(ValueError):
+            node.render_to(io.StringIO())
+
+            
+            
+    def test_deeply_nested_nodes(self):
+        node = LeafNode(None, "text")
+        for _ in range(5000):
+            node = ParentNode("blockquote", [ParentNode("", [node])])
+        assert node.to_html() == "<blockquote>" * 5000 + "text" + "</blockquote>" * 5000            
             
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import unittest
+
+from manifest import BuildManifest, hash_bytes, hash_file
+from site_fixture import TempSite
+
+
+class TestBuildManifest(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = self.path("manifest.json")
+        self.src = self.write("page.md", "# Page")
+        self.dest = self.write("page.html", "<h1>Page</h1>")
+
+
+    def build(self, template_hash="t1"):
+        manifest = BuildManifest(self.manifest_path, template_hash)
+        src_hash = hash_file(self.src)
+        up_to_date = manifest.is_up_to_date(self.src, src_hash, self.dest)
+        manifest.record(self.src, src_hash, self.dest)
+        manifest.remove_stale()
+        manifest.save()
+        return up_to_date
+
+
+    def test_hash_file(self):
+        assert hash_file(self.src) == hash_bytes(b"# Page")
+
+
+    def test_first_build_not_up_to_date(self):
+        assert self.build() == False
+
+
+    def test_unchanged_page_up_to_date(self):
+        self.build()
+        assert self.build() == True
+
+
+    def test_changed_source(self):
+        self.build()
+        self.write(self.src, "# Changed")
+        assert self.build() == False
+
+
+    def test_changed_template(self):
+        self.build()
+        assert self.build(template_hash="t2") == False
+
+
+    def test_missing_output(self):
+        self.build()
+        os.remove(self.dest)
+        assert self.build() == False
+
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(self.src)
+        manifest = BuildManifest(self.manifest_path, "t1")
+        removed = manifest.remove_stale()
+        assert removed == [self.dest]
+        assert not os.path.exists(self.dest)
+
+
+    def test_dropped_page_removes_output(self):
+        self.build()
+        manifest = BuildManifest(self.manifest_path, "t1")
+        manifest.drop(self.src)
+        assert manifest.remove_stale() == [self.dest]
+        assert not os.path.exists(self.dest)
+
+
+    def test_previous_title(self):
+        manifest = BuildManifest(self.manifest_path, "t1")
+        manifest.record(self.src, hash_file(self.src), self.dest, "Page")
+        manifest.save()
+        assert BuildManifest(self.manifest_path, "t1").previous_title(self.src) == "Page"
+
+
+if __name__ == "__main__":
+    unittest.main()
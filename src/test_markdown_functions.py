@@ -86,6 +86,18 @@ class TestExtractMarkdownLinksImages(unittest.TestCase):
         assert extract_markdown_links(text) == [("empty anchor text", "https://emptyanchor.com")]
         
         
+    def test_unmatched_brackets(self):
+        assert extract_markdown_links("[" * 1000 + "](x") == []
+        assert extract_markdown_images("![" * 1000) == []
+        assert extract_markdown_links("[a](" * 1000) == []
+        assert extract_markdown_links("[" * 1000 + "a](b)") == [("[" * 999 + "a", "b")]
+        
+        
+    def test_link_across_lines(self):
+        assert extract_markdown_links("[a\nb](c)") == []
+        assert extract_markdown_links("[a](b\nc) [d](e)") == [("d", "e")]
+        
+        
 class TestSplitNodesLinksImages(unittest.TestCase):
     def test_link_nodes(self):
         node = TextNode("This is text with a link [to boot dev](https://www.boot.dev) and [to youtube](https://www.youtube.com/@bootdotdev)", "text")
@@ -249,6 +261,16 @@ class TestSplitNodesLinksImages(unittest.TestCase):
         assert result == expected, f"Expected {expected}, but got {result}"
         
         
+    def test_text_matching_link_parts(self):
+        node = TextNode("a[a](a)", "text")
+        expected = [
+            TextNode("a", "text"),
+            TextNode("a", "link", "a")
+        ]
+        result = split_nodes_link([node])
+        assert result == expected, f"Expected {expected}, but got {result}"
+        
+        
 class TestTextToTextNodes(unittest.TestCase):
     def test_text_to_textnodes(self):
         input_text = "This is **bold** and *italic* and `code`"
@@ -306,6 +328,94 @@ class TestTextToTextNodes(unittest.TestCase):
         
         output = text_to_textnodes(input_text)
         assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_unmatched_delimiters(self):
+        input_text = "a **b and `c with *d"
+        expected_output = [
+            TextNode("a **b and `c with *d", "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_delimiters_inside_code(self):
+        input_text = "Run `a * b ** c` now"
+        expected_output = [
+            TextNode("Run ", "text"),
+            TextNode("a * b ** c", "code"),
+            TextNode(" now", "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_mixed_inline_tokens(self):
+        input_text = "![img](a.png) then [link](b) and **bold**[]() end"
+        expected_output = [
+            TextNode("img", "image", "a.png"),
+            TextNode(" then ", "text"),
+            TextNode("link", "link", "b"),
+            TextNode(" and ", "text"),
+            TextNode("bold", "bold"),
+            TextNode(" end", "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+
+
+        
+        
+    def test_link_inside_bold(self):
+        input_text = "**Read [the docs](http://x)** now"
+        expected_output = [
+            TextNode("Read ", "text"),
+            TextNode("the docs", "link", "http://x"),
+            TextNode(" now", "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_link_inside_italic(self):
+        input_text = "go *to [the docs](http://x)* now"
+        expected_output = [
+            TextNode("go *to ", "text"),
+            TextNode("the docs", "link", "http://x"),
+            TextNode("* now", "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_delimiter_inside_url(self):
+        input_text = "see *[a](http://x/*y)* ok, **b** and `c`"
+        expected_output = [
+            TextNode("see *", "text"),
+            TextNode("a", "link", "http://x/*y"),
+            TextNode("* ok, ", "text"),
+            TextNode("b", "bold"),
+            TextNode(" and ", "text"),
+            TextNode("c", "code")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
+        
+        
+    def test_unmatched_brackets_and_delimiters(self):
+        input_text = "[" * 500 + "![" * 500 + "[a](" * 500 + " **b *c `d"
+        expected_output = [
+            TextNode(input_text, "text")
+        ]
+        
+        output = text_to_textnodes(input_text)
+        assert output == expected_output, f"Expected {expected_output} but got {output}"
 
 
 class TestMarkDownToBlocks(unittest.TestCase):
@@ -367,6 +477,42 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
         assert output == expected, f"Expected {expected} but got {output}"
         
         
+    def test_code_block_with_blank_lines_and_headings(self):
+        input_text = """Paragraph before code
+```
+# not a heading
+
+still code
+```
+After code"""
+        expected = [('paragraph', 'Paragraph before code'), ('code', '```\n# not a heading\n\nstill code\n```'), ('paragraph', 'After code')]
+        output = list(scan_blocks(input_text))
+        assert output == expected, f"Expected {expected} but got {output}"
+        
+        
+    def test_unclosed_code_fence(self):
+        input_text = """```
+text after an unclosed fence
+
+## Heading"""
+        expected = [('paragraph', '```\ntext after an unclosed fence'), ('heading', '## Heading')]
+        output = list(scan_blocks(input_text))
+        assert output == expected, f"Expected {expected} but got {output}"
+        
+        
+    def test_typed_blocks(self):
+        input_text = """# Heading
+> quote
+
+1. one
+2. two
+
+- dash item"""
+        expected = ['heading', 'quote', 'ordered_list', 'unordered_list']
+        output = [block_type for block_type, _ in scan_blocks(input_text)]
+        assert output == expected, f"Expected {expected} but got {output}"
+        
+        
 class TestBlockToBlockType(unittest.TestCase):
     def test_block_to_header_single(self):
         input_text = """# This is a heading"""
@@ -594,6 +740,14 @@ This is another code line```
         self.assertEqual(li_node.tag, "li")
         
         
+    def test_deeply_nested_quotes(self):
+        markdown_text = "\n".join(["> " * 1000 + "first", "> " * 1000 + "second"])
+        
+        html = markdown_to_html_node(markdown_text).to_html()
+        
+        assert html == "<div>" + "<blockquote>" * 1000 + "<p>first\nsecond</p>" + "</blockquote>" * 1000 + "</div>"
+        
+        
     def test_content_in_code_blocks(self):
         markdown_text = """```
 def example():
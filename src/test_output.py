@@ -0,0 +1,142 @@
+import os
+import unittest
+from unittest import mock
+
+from helpers import copy_contents, generate_pages_recursive, sync_contents
+from output import AtomicFile, DiskOutput, MemoryOutput, copy_file, current_umask
+from site_fixture import TempSite
+
+
+class TestMemoryOutput(unittest.TestCase):
+    def test_write_and_read(self):
+        output = MemoryOutput()
+        with output.open("public/index.html", 'w') as file:
+            file.write("<h1>Home</h1>")
+        assert output.read("public/./index.html") == b"<h1>Home</h1>"
+        assert output.stat("public/index.html").st_size == 13
+        with output.open("public/index.html", 'r') as file:
+            assert file.read() == "<h1>Home</h1>"
+            
+            
+    def test_remove(self):
+        output = MemoryOutput()
+        for path in ("public/a.html", "public/blog/b.html", "other/c.html"):
+            with output.open(path, 'wb') as file:
+                file.write(b"x")
+        output.remove("public/a.html")
+        with self.assertRaises(FileNotFoundError):
+            output.stat("public/a.html")
+        output.rmtree("public")
+        assert list(output.files) == [os.path.normpath("other/c.html")]
+        
+        
+class TestAtomicFile(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self.write("index.html", "<h1>Home</h1>", mtime_ns=1_000_000_000)
+        
+        
+    def read(self):
+        with open(self.page) as file:
+            return file.read()
+        
+        
+    def test_identical_content_is_not_written(self):
+        with AtomicFile(self.page) as file:
+            file.write("<h1>Home</h1>")
+        assert file.changed == False
+        assert os.stat(self.page).st_mtime_ns == 1_000_000_000
+        assert os.listdir(self.tmp.name) == ["index.html"]
+        
+        
+    def test_changed_content_replaces_file(self):
+        inode = os.stat(self.page).st_ino
+        with DiskOutput().open(self.page, 'w') as file:
+            file.write("<h1>Changed</h1>")
+            #the page is only visible once it is complete
+            assert self.read() == "<h1>Home</h1>"
+        assert file.changed == True
+        assert self.read() == "<h1>Changed</h1>"
+        assert os.stat(self.page).st_ino != inode
+        assert os.listdir(self.tmp.name) == ["index.html"]
+        
+        
+    def test_error_keeps_previous_file(self):
+        with self.assertRaises(ValueError):
+            with AtomicFile(self.page) as file:
+                file.write("<h1>Half")
+                raise ValueError("render failed")
+        assert self.read() == "<h1>Home</h1>"
+        assert os.listdir(self.tmp.name) == ["index.html"]
+        
+        
+    def test_copy_file_does_not_write_through_links(self):
+        src = self.write("src.css", "body {}")
+        copy_file(src, self.page, link=True)
+        self.write(src, "p {}")
+        copy_file(src, self.page)
+        assert self.read() == "p {}"
+        assert os.stat(self.page).st_ino != os.stat(src).st_ino
+        assert sorted(os.listdir(self.tmp.name)) == ["index.html", "src.css"]
+        
+        
+    def test_failed_replace_removes_temporary_file(self):
+        file = AtomicFile(self.page)
+        file.write("<h1>Changed</h1>")
+        with mock.patch("os.replace", side_effect=PermissionError("read-only")):
+            with self.assertRaises(PermissionError):
+                file.close()
+            src = self.write("src.css", "body {}")
+            with self.assertRaises(PermissionError):
+                copy_file(src, self.page)
+        assert self.read() == "<h1>Home</h1>"
+        assert sorted(os.listdir(self.tmp.name)) == ["index.html", "src.css"]
+        
+        
+    def test_permissions_follow_umask(self):
+        #the umask is read once, without changing it
+        umask = os.umask(0o027)
+        try:
+            with mock.patch("output._umask", None), mock.patch("os.umask") as umask_mock:
+                with AtomicFile(self.page) as file:
+                    file.write("<h1>Changed</h1>")
+                assert current_umask() == 0o027
+                umask_mock.assert_not_called()
+        finally:
+            os.umask(umask)
+        assert os.stat(self.page).st_mode & 0o777 == 0o640
+        
+        
+class TestMemoryBuild(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site({"index.md": "# Home", "blog/post.md": "# Post\n\nSome *text*"},
+                        {"index.css": "body {}", "images/logo.svg": "<svg/>"})
+        
+        
+    def test_build_without_disk_writes(self):
+        output = MemoryOutput()
+        copy_contents(self.static, self.public, output)
+        failures = generate_pages_recursive(self.content, self.template, self.public, jobs=2, output=output)
+        assert failures == 0
+        assert not os.path.exists(self.public)
+        assert output.read(os.path.join(self.public, "blog", "post.html")) == b"<title>Post</title><div><h1>Post</h1><p>Some <i>text</i></p></div>"
+        assert output.read(os.path.join(self.public, "images", "logo.svg")) == b"<svg/>"
+        
+        
+    def test_sync_skips_unchanged_assets(self):
+        output = MemoryOutput()
+        assert len(sync_contents(self.static, self.public, output=output)) == 2
+        assert sync_contents(self.static, self.public, output=output) == []
+        
+        
+    def test_same_output_as_disk(self):
+        output = MemoryOutput()
+        generate_pages_recursive(self.content, self.template, self.public, output=output)
+        generate_pages_recursive(self.content, self.template, self.public, output=DiskOutput())
+        with open(os.path.join(self.public, "index.html"), 'rb') as file:
+            assert output.read(os.path.join(self.public, "index.html")) == file.read()
+            
+            
+if __name__ == "__main__":
+    unittest.main()
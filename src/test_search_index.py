@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import subprocess
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from markdown_functions import markdown_to_html_node
+from search_index import SEARCH_SCRIPT, SearchIndex, iter_text, shard_name, tokenize
+from site_fixture import TempSite
+
+
+class TestTokenize(unittest.TestCase):
+    def test_iter_text(self):
+        node = ParentNode("div", [LeafNode("b", "One"), ParentNode("p", [LeafNode(None, "two "), LeafNode("i", "three")])])
+        assert list(iter_text(node)) == ["One", "two ", "three"]
+        
+        
+    def test_tokenize(self):
+        node = markdown_to_html_node("# The Lord\n\nthe **rings** of a lord")
+        assert tokenize(node) == {"the": 2, "lord": 2, "rings": 1, "of": 1}
+        
+        
+    def test_shard_name(self):
+        assert shard_name("lord") == "lo"
+        assert shard_name("éowyn") == "_"
+        
+        
+    def test_non_ascii_terms(self):
+        node = markdown_to_html_node("Éowyn rides to Minas Tirith, 2019")
+        assert tokenize(node) == {"éowyn": 1, "rides": 1, "to": 1, "minas": 1, "tirith": 1, "2019": 1}
+        
+        
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_script_terms_match_tokenize(self):
+        #the search script must split a query into the very terms the index was built with
+        text = "Éowyn and Þeoden, naïve_words, 2019 a Ωmega"
+        start = SEARCH_SCRIPT.index("function searchTerms")
+        end = SEARCH_SCRIPT.index("\n}\n", start) + 3
+        program = SEARCH_SCRIPT[start:end] + f"console.log(JSON.stringify(searchTerms({json.dumps(text)})));"
+        result = subprocess.run(["node", "-e", program], capture_output=True, text=True, check=True)
+        assert json.loads(result.stdout) == list(tokenize(LeafNode(None, text)))
+        
+        
+class TestSearchIndex(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.state_path = self.path("state.json")
+        self.output_dir = self.path("search")
+        
+        
+    def index(self):
+        return SearchIndex(self.state_path, self.output_dir)
+    
+    
+    def shard(self, name):
+        with open(os.path.join(self.output_dir, f"{name}.json"), 'r') as file:
+            return json.load(file)
+        
+        
+    def test_save(self):
+        index = self.index()
+        index.update("a.md", "/a.html", "A", {"lord": 2, "ring": 1})
+        index.update("b.md", "/b.html", "B", {"lord": 1})
+        index.save()
+        assert self.shard("lo") == {"lord": [[0, 2], [1, 1]]}
+        assert self.shard("ri") == {"ring": [[0, 1]]}
+        with open(os.path.join(self.output_dir, "pages.json"), 'r') as file:
+            assert json.load(file)["pages"]["1"] == {"url": "/b.html", "title": "B"}
+            
+            
+    def test_incremental_update(self):
+        index = self.index()
+        index.update("a.md", "/a.html", "A", {"lord": 2, "ring": 1})
+        index.update("b.md", "/b.html", "B", {"lord": 1, "elf": 1})
+        index.save()
+        
+        index = self.index()
+        assert index.has("a.md")
+        index.keep("a.md")
+        index.update("b.md", "/b.html", "B", {"lord": 3})
+        index.remove_unseen()
+        assert index.save() == ["el", "lo"]
+        assert self.shard("lo") == {"lord": [[0, 2], [1, 3]]}
+        assert not os.path.exists(os.path.join(self.output_dir, "el.json"))
+        
+        
+    def test_removed_page(self):
+        index = self.index()
+        index.update("a.md", "/a.html", "A", {"lord": 2})
+        index.update("b.md", "/b.html", "B", {"lord": 1})
+        index.save()
+        
+        index = self.index()
+        index.keep("b.md")
+        index.remove_unseen()
+        assert index.save() == ["lo"]
+        assert self.shard("lo") == {"lord": [[1, 1]]}
+        
+        
+    def test_missing_output_resets_state(self):
+        index = self.index()
+        index.update("a.md", "/a.html", "A", {"lord": 2})
+        index.save()
+        os.remove(os.path.join(self.output_dir, "pages.json"))
+        assert not self.index().has("a.md")
+        
+        
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import gzip
+import http.client
+import os
+import threading
+import unittest
+
+from compress import compress_file
+from server import accepted_encodings, etag_matches, make_server
+from site_fixture import TempSite
+
+
+class TestHeaders(unittest.TestCase):
+    def test_accepted_encodings(self):
+        assert accepted_encodings("gzip, deflate, br;q=0.5") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("gzip;q=0, br") == {"br"}
+        assert accepted_encodings(None) == set()
+        
+        
+    def test_etag_matches(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
+        
+        
+class TestStaticServer(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("index.html", b"<h1>Home</h1>" * 100)
+        self.write("blog/index.html", b"<h1>Blog</h1>")
+        self.write("big.bin", os.urandom(512 * 1024))
+        self.server = make_server(self.tmp.name, 0, quiet=True, host="127.0.0.1")
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+        
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+        
+        
+    def get(self, path, headers={}):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1])
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+    
+    
+    def test_index_and_not_found(self):
+        response, body = self.get("/blog/")
+        assert response.status == 200
+        assert body == b"<h1>Blog</h1>"
+        assert response.getheader("Content-Type") == "text/html"
+        assert self.get("/missing.html")[0].status == 404
+        assert self.get("/blog")[0].status == 301
+        
+        
+    def test_etag(self):
+        response, _ = self.get("/")
+        etag = response.getheader("ETag")
+        response, body = self.get("/", {"If-None-Match": etag})
+        assert response.status == 304
+        assert body == b""
+        
+        self.write("index.html", b"<h1>Changed</h1>")
+        response, body = self.get("/", {"If-None-Match": etag})
+        assert response.status == 200
+        assert body == b"<h1>Changed</h1>"
+        
+        
+    def test_precompressed(self):
+        compress_file(self.path("index.html"), ["gz"])
+        response, body = self.get("/", {"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert gzip.decompress(body) == b"<h1>Home</h1>" * 100
+        
+        response, body = self.get("/", {"Accept-Encoding": "br"})
+        assert response.getheader("Content-Encoding") is None
+        assert body == b"<h1>Home</h1>" * 100
+        
+        
+    def test_large_file(self):
+        response, body = self.get("/big.bin")
+        with open(self.path("big.bin"), 'rb') as file:
+            assert body == file.read()
+        assert response.getheader("Content-Length") == str(512 * 1024)
+        
+        
+    def test_memory_cache(self):
+        self.get("/blog/")
+        path = self.path("blog", "index.html")
+        assert path in self.server.file_cache.entries
+        assert self.get("/blog/")[1] == b"<h1>Blog</h1>"
+        
+        
+    def test_replaced_while_served(self):
+        #files replaced by a rename, as the build writes them, are always sent whole, with their own length and ETag
+        versions = [b"short", b"<p>longer version</p>" * 100]
+        etags = {}
+        stop = threading.Event()
+        def replace():
+            count = 0
+            while not stop.is_set():
+                os.replace(self.write(".blog.tmp", versions[count % 2]), self.path("blog", "index.html"))
+                count += 1
+        thread = threading.Thread(target=replace)
+        thread.start()
+        try:
+            for _ in range(200):
+                response, body = self.get("/blog/")
+                assert body in versions
+                assert response.getheader("Content-Length") == str(len(body))
+                assert etags.setdefault(response.getheader("ETag"), body) == body
+        finally:
+            stop.set()
+            thread.join()
+            
+            
+if __name__ == "__main__":
+    unittest.main()
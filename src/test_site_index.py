@@ -0,0 +1,45 @@
+import unittest
+
+from site_index import SiteIndex, page_url
+
+
+class TestPageUrl(unittest.TestCase):
+    def test_urls(self):
+        assert page_url("public/index.html", "public") == "/"
+        assert page_url("public/majesty/index.html", "public") == "/majesty/"
+        assert page_url("public/blog/post.html", "public") == "/blog/post.html"
+        
+        
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SiteIndex("public")
+        self.index.add("content/a.md", "public/a.html", {"date": "2024-01-02", "tags": ["elves"]})
+        self.index.add("content/b.md", "public/b.html", {"date": "2024-03-01", "tags": "dwarves", "title": "B"})
+        self.index.add("content/c.md", "public/c.html", {})
+        
+        
+    def test_titles(self):
+        self.index.set_title("content/a.md", "A")
+        self.index.set_title("content/b.md", "Not B")
+        assert self.index.get("content/a.md")["title"] == "A"
+        assert self.index.get("content/b.md")["title"] == "B"
+        
+        
+    def test_publish(self):
+        published = []
+        self.index.listeners.append(published.append)
+        self.index.publish("content/a.md", "A")
+        assert [(entry["src"], entry["title"]) for entry in published] == [("content/a.md", "A")]
+        
+        
+    def test_tags(self):
+        assert [entry["src"] for entry in self.index.with_tag("dwarves")] == ["content/b.md"]
+        assert sorted(self.index.tags()) == ["dwarves", "elves"]
+        
+        
+    def test_by_date(self):
+        assert [entry["src"] for entry in self.index.by_date()] == ["content/b.md", "content/a.md"]
+        
+        
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import io
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_segments(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        assert template.literals == ["<title>", "</title><body>", "</body>"]
+        assert template.slots == [("Title", "{{ Title }}"), ("Content", "{{ Content }}")]
+        
+        
+    def test_write(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        output = io.StringIO()
+        template.write(output, {"Title": "Hello", "Content": "<p>World</p>"})
+        assert output.getvalue() == "<title>Hello</title><body><p>World</p></body>"
+        
+        
+    def test_write_node(self):
+        template = Template("<body>{{ Content }}</body>")
+        output = io.StringIO()
+        template.write(output, {"Content": ParentNode("div", [LeafNode("p", "text")])})
+        assert output.getvalue() == "<body><div><p>text</p></div></body>"
+        
+        
+    def test_repeated_slot(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        assert template.render({"Title": "Hello"}) == "Hello - Hello"
+        
+        
+    def test_missing_value(self):
+        template = Template("<p>{{ Unknown }}</p>")
+        assert template.render({}) == "<p>{{ Unknown }}</p>"
+        
+        
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        assert template.render({"Title": "Hello"}) == "<p>static</p>"
+        
+        
+if __name__ == "__main__":
+    unittest.main()
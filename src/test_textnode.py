@@ -41,6 +41,11 @@ class TestTextNode(unittest.TestCase):
         self.assertNotEqual(node, node2)
         
         
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", "bold")
+        assert not hasattr(node, "__dict__")
+        
+        
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
         text_node = TextNode("This is plain text.", "text")
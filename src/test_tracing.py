@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+
+import tracing
+
+
+class TestTracing(unittest.TestCase):
+    def tearDown(self):
+        tracing.enabled = False
+        tracing.events.clear()
+        
+        
+    def test_disabled_records_nothing(self):
+        with tracing.span("parse"):
+            pass
+        assert tracing.events == []
+        
+        
+    def test_span_event(self):
+        tracing.enable()
+        with tracing.span("parse", path="content/index.md"):
+            pass
+        event = tracing.events[0]
+        assert event["name"] == "parse"
+        assert event["ph"] == "X"
+        assert event["pid"] == os.getpid()
+        assert event["dur"] >= 0
+        assert event["args"] == {"path": "content/index.md"}
+        
+        
+    def test_span_recorded_on_error(self):
+        tracing.enable()
+        with self.assertRaises(ValueError):
+            with tracing.span("parse"):
+                raise ValueError("broken page")
+        assert len(tracing.events) == 1
+        
+        
+    def test_take_events(self):
+        tracing.enable()
+        with tracing.span("read"):
+            pass
+        taken = tracing.take_events()
+        assert len(taken) == 1
+        assert tracing.events == []
+        
+        
+    def test_write_trace(self):
+        tracing.enable()
+        with tracing.span("build"):
+            pass
+        tracing.add_events([{"name": "page", "ph": "X", "ts": 0, "dur": 1, "pid": 1, "tid": 1, "args": {}}])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            tracing.write_trace(path)
+            with open(path) as file:
+                trace = json.load(file)
+        names = {event["pid"]: event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        assert names == {1: "worker 1", os.getpid(): "main"}
+        assert len([event for event in trace["traceEvents"] if event["ph"] == "X"]) == 2
+        
+        
+if __name__ == "__main__":
+    unittest.main()
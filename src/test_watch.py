@@ -0,0 +1,124 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+from site_fixture import TempSite
+from watch import LiveReload, SiteWatcher, changed_files, main
+
+
+class TestChangedFiles(unittest.TestCase):
+    def test_changed_added_deleted(self):
+        old = {"a.md": (1, 10), "b.md": (1, 10), "c.md": (1, 10)}
+        new = {"a.md": (1, 10), "b.md": (2, 12), "d.md": (1, 5)}
+        assert changed_files(old, new) == (["b.md", "d.md"], ["c.md"])
+        
+        
+class TestMain(unittest.TestCase):
+    def test_full_build_options_are_refused(self):
+        #they would only apply to the first build
+        for option in (["--search"], ["--base-url", "https://example.com"], ["--compress", "gz"], ["--changes-file", "changes.json"]):
+            with mock.patch("sys.argv", ["watch.py"] + option), redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    main()
+            assert "cannot be used in watch mode" in stderr.getvalue()
+        
+        
+class TestSiteWatcher(TempSite, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.static)
+        os.makedirs(self.public)
+        self.write_site({"index.md": "# Home", "blog/post.md": "# Post"})
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public)
+        
+        
+    def write(self, path, text):
+        path = super().write(path, text)
+        #making sure the modification time changes even on filesystems with a coarse clock
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts)) as file:
+            return file.read()
+        
+        
+    def test_no_changes(self):
+        assert self.watcher.poll() == 0
+        
+        
+    def test_single_page_change(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited post")
+        assert self.watcher.poll() == 1
+        assert self.read("blog", "post.html") == "<title>Edited post</title><div><h1>Edited post</h1></div>"
+        assert not os.path.exists(os.path.join(self.public, "index.html"))
+        
+        
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+        assert self.watcher.poll() == 2
+        assert self.read("index.html") == "<h1>Home</h1>"
+        assert self.read("blog", "post.html") == "<h1>Post</h1>"
+        
+        
+    def test_deleted_page_and_asset(self):
+        self.write(os.path.join(self.static, "site.css"), "body {}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        assert self.watcher.poll() == 2
+        assert self.read("site.css") == "body {}"
+        
+        os.remove(os.path.join(self.content, "index.md"))
+        os.remove(os.path.join(self.static, "site.css"))
+        assert self.watcher.poll() == 2
+        assert not os.path.exists(os.path.join(self.public, "index.html"))
+        assert not os.path.exists(os.path.join(self.public, "site.css"))
+
+        
+        
+    def test_front_matter(self):
+        page_template = self.path("page.html")
+        self.write(page_template, "<h2>{{ Title }}</h2>")
+        self.write(os.path.join(self.content, "blog", "post.md"), f"---\ntitle: Custom\ntemplate: {page_template}\n---\n# Post")
+        assert self.watcher.poll() == 1
+        assert self.read("blog", "post.html") == "<h2>Custom</h2>"
+        
+        self.write(os.path.join(self.content, "blog", "post.md"), "---\ntitle: 1984\n---\n# Post")
+        assert self.watcher.poll() == 1
+        assert self.read("blog", "post.html") == "<title>1984</title><div><h1>Post</h1></div>"
+        
+        self.write(os.path.join(self.content, "blog", "post.md"), "---\ndraft: true\n---\n# Post")
+        assert self.watcher.poll() == 1
+        assert not os.path.exists(os.path.join(self.public, "blog", "post.html"))
+        
+        
+    def test_missing_template_is_retried(self):
+        os.remove(self.template)
+        assert self.watcher.poll() == 0
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+        assert self.watcher.poll() == 2
+        assert self.read("index.html") == "<h1>Home</h1>"
+        
+        
+    def test_failed_asset_copy_is_retried(self):
+        asset_path = os.path.join(self.static, "site.css")
+        self.write(asset_path, "body {}")
+        os.makedirs(os.path.join(self.public, "site.css"))
+        assert self.watcher.poll() == 1
+        
+        os.rmdir(os.path.join(self.public, "site.css"))
+        assert self.watcher.poll() == 1
+        assert self.read("site.css") == "body {}"        
+        
+class TestLiveReload(unittest.TestCase):
+    def test_wait_returns_new_version(self):
+        live_reload = LiveReload()
+        live_reload.notify()
+        assert live_reload.wait(0, timeout=0) == 1
+        assert live_reload.wait(1, timeout=0) == 1
+        
+        
+if __name__ == "__main__":
+    unittest.main()
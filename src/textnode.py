@@ -1,6 +1,9 @@
 from htmlnode import LeafNode
 
 class TextNode:
+    #one TextNode is created per inline token, slots keep them small
+    __slots__ = ("text", "text_type", "url")
+    
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
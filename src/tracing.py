@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+#opt-in build tracing, recording spans as Chrome trace events (viewable in chrome://tracing or ui.perfetto.dev)
+#spans are only recorded after enable() was called, otherwise span() does nothing
+enabled = False
+events = []
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def start_worker():
+    #pool initializer for worker processes: forked workers inherit the parent events, which must not be sent back twice
+    enable()
+    events.clear()
+
+
+@contextmanager
+def span(name, category="build", **args):
+    if not enabled:
+        yield
+        return
+
+    #perf_counter_ns is a system-wide monotonic clock on Linux and macOS, so worker timestamps line up with the main process
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+
+def take_events():
+    #returning and forgetting the events recorded so far, used by workers to send their spans back with each result
+    taken = events[:]
+    events.clear()
+    return taken
+
+
+def add_events(new_events):
+    events.extend(new_events)
+
+
+def write_trace(path):
+    #naming every process, so each worker shows up as its own row in the timeline
+    main_pid = os.getpid()
+    process_names = []
+    for pid in sorted({event["pid"] for event in events}):
+        process_names.append({
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "main" if pid == main_pid else f"worker {pid}"},
+        })
+
+    with open(path, 'w') as file:
+        json.dump({"traceEvents": process_names + events, "displayTimeUnit": "ms"}, file)
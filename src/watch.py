@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from helpers import generate_page, read_page
+from output import copy_file
+from main import build, make_parser
+from server import StaticHandler, make_server
+from template import Template
+
+#injected in every served html page, reloading it when the server sends a reload event
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+
+
+class LiveReload:
+    #build counter shared between the watcher and the connected browsers
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+
+    def wait(self, version, timeout):
+        #blocking until a build newer than version is done, or the timeout expires
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class LiveReloadHandler(StaticHandler):
+    #serving ./public, with the live reload script injected in html pages and a server-sent events endpoint
+    #every other file is served by StaticHandler, with ETags and precompressed siblings
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_events()
+            return
+
+        url_path = urlsplit(self.path).path
+        path = self.translate_path(url_path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if url_path.endswith(("/", ".html")) and path.endswith(".html") and os.path.isfile(path):
+            self.send_page(path)
+            return
+
+        super().do_GET()
+
+
+    def send_page(self, path):
+        with open(path, 'rb') as file:
+            html = file.read()
+
+        script = LIVE_RELOAD_SCRIPT.encode()
+        position = html.rfind(b"</body>")
+        if position == -1:
+            html += script
+        else:
+            html = html[:position] + script + html[position:]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(html)
+
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        version = self.server.live_reload.version
+        try:
+            while True:
+                new_version = self.server.live_reload.wait(version, timeout=15)
+                if new_version == version:
+                    #comment lines keep idle connections open
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+    def log_message(self, format, *args):
+        #the event stream and the page requests would flood the build output
+        pass
+
+
+def snapshot_files(dir_path, suffix=""):
+    #mapping every file under dir_path to its (modification time, size)
+    files = {}
+    for root, dir_names, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            if file_name.endswith(suffix):
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_files(old, new):
+    #returning the (changed or added, deleted) paths between two snapshots
+    changed = [path for path, state in new.items() if old.get(path) != state]
+    deleted = [path for path in old if path not in new]
+    return sorted(changed), sorted(deleted)
+
+
+class SiteWatcher:
+    #polling the content, static and template files, and rebuilding only the outputs affected by a change
+    def __init__(self, content_dir, static_dir, template_path, public_dir):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.public_dir = public_dir
+        self.template = Template.load(template_path)
+        self.template_state = self.template_stat()
+        self.pages = snapshot_files(content_dir, ".md")
+        self.assets = snapshot_files(static_dir)
+
+
+    def template_stat(self):
+        stat = os.stat(self.template_path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+    def page_dest_path(self, src_path):
+        relative_path = os.path.relpath(src_path, self.content_dir)
+        return os.path.join(self.public_dir, os.path.splitext(relative_path)[0] + ".html")
+
+
+    def asset_dest_path(self, src_path):
+        return os.path.join(self.public_dir, os.path.relpath(src_path, self.static_dir))
+
+
+    def poll(self):
+        #returning the number of outputs that were rebuilt or removed
+        #a file that cannot be read or copied (an editor replacing it, a file deleted while we look at it) is retried on the next poll
+        pages = snapshot_files(self.content_dir, ".md")
+        assets = snapshot_files(self.static_dir)
+
+        changed_pages, deleted_pages = changed_files(self.pages, pages)
+        changed_assets, deleted_assets = changed_files(self.assets, assets)
+
+        try:
+            template_state = self.template_stat()
+            if template_state != self.template_state:
+                #a template change affects every page
+                self.template = Template.load(self.template_path)
+                self.template_state = template_state
+                changed_pages = sorted(pages)
+        except OSError as e:
+            print(f"An error occurred while reading {self.template_path}: {str(e)}")
+
+        self.pages = pages
+        self.assets = assets
+
+        #page templates named in the front matter are loaded again on every poll, so an edited page picks up their changes
+        templates = {}
+        for src_path in changed_pages:
+            dest_path = self.page_dest_path(src_path)
+            try:
+                #the same front matter handling as a full build: drafts are not published, page templates and titles are used
+                metadata, body, page_template, _ = read_page(src_path, templates)
+                if metadata.get("draft") is True:
+                    print(f"Skipping draft {src_path}")
+                    if os.path.exists(dest_path):
+                        print(f"Removing {dest_path}")
+                        os.remove(dest_path)
+                    continue
+
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                generate_page(src_path, page_template or self.template, dest_path, content=body, title=metadata.get("title"))
+            except OSError as e:
+                print(f"An error occurred while generating {src_path}: {str(e)}")
+                #a state no file can have, so the page is seen as changed (or deleted) on the next poll
+                self.pages[src_path] = None
+            except Exception as e:
+                print(f"An error occurred while generating {src_path}: {str(e)}")
+
+        for src_path in changed_assets:
+            dest_path = self.asset_dest_path(src_path)
+            print(f"Copying {src_path} to {dest_path}")
+            try:
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                copy_file(src_path, dest_path)
+            except OSError as e:
+                print(f"An error occurred while copying {src_path}: {str(e)}")
+                self.assets[src_path] = None
+
+        for dest_path in ([self.page_dest_path(path) for path in deleted_pages] +
+                          [self.asset_dest_path(path) for path in deleted_assets]):
+            if os.path.exists(dest_path):
+                print(f"Removing {dest_path}")
+                try:
+                    os.remove(dest_path)
+                except OSError as e:
+                    print(f"An error occurred while removing {dest_path}: {str(e)}")
+
+        return len(changed_pages) + len(changed_assets) + len(deleted_pages) + len(deleted_assets)
+
+
+def main():
+    parser = make_parser()
+    parser.description = "Build the site, serve ./public and rebuild the affected pages whenever a source file changes"
+    parser.add_argument("--port", type=int, default=8888, help="port of the preview server")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between two polls of the source files")
+    args = parser.parse_args()
+    #a poll only rebuilds pages and assets, the search index, sitemap, feed, compressed siblings and changes file would go stale
+    if args.search or args.base_url or args.compress or args.changes_file or args.in_memory:
+        parser.error("--search, --base-url, --compress, --changes-file and --in-memory cannot be used in watch mode, run main.py for a full build")
+
+    build(args)
+
+    live_reload = LiveReload()
+    server = make_server("public", args.port, LiveReloadHandler, quiet=True)
+    server.live_reload = live_reload
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving ./public on http://localhost:{args.port}, watching for changes")
+
+    watcher = SiteWatcher("content", "static", "./template.html", "public")
+    try:
+        while True:
+            time.sleep(args.interval)
+            started = time.perf_counter()
+            if watcher.poll():
+                live_reload.notify()
+                print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()